@@ -1,8 +1,13 @@
-import pickle
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from utils import get_data_path
+from utils import get_data_path, save_cache, load_cache
+
+# The Google client libraries are imported inside the functions that use
+# them so that importing this module (and showing the first window) stays
+# cheap
 
 SCOPES = [
     "https://www.googleapis.com/auth/gmail.send",
@@ -10,9 +15,26 @@ SCOPES = [
     "https://www.googleapis.com/auth/documents.readonly",
     "https://www.googleapis.com/auth/spreadsheets.readonly"
 ]
-TOKEN_FILE = get_data_path("token.pickle")
+TOKEN_FILE = get_data_path("token.json")
+LEGACY_TOKEN_FILE = get_data_path("token.pickle")
 CREDENTIALS_FILE = get_data_path("google-oauth-credentials.json")
 
+# In-process copy of the stored credentials, valid while the token file's
+# modification time is unchanged
+_CREDS_CACHE = {"mtime": None, "creds": None}
+_CREDS_LOCK = threading.Lock()
+
+# Recently built API clients keyed by (api, version, account key), most
+# recently used last, so logging out and back in to the same account
+# reuses its clients
+SERVICE_CACHE_SIZE = 4
+_SERVICE_CACHE = OrderedDict()
+_SERVICE_LOCK = threading.Lock()
+
+# Account address per Gmail client; clients are reused per account, so
+# rebuilding the email frame doesn't ask Gmail for the profile again
+_USER_EMAIL_CACHE = {}
+
 
 def credentials_file_exists() -> bool:
     """Check if the credentials file exists."""
@@ -23,70 +45,242 @@ def is_authenticated() -> bool:
     return TOKEN_FILE.exists()
 
 
-def authenticate():
-    creds = None
+def _save_creds(creds):
+    """Write credentials to the token file as authorized-user JSON."""
+    with open(TOKEN_FILE, "w") as token:
+        token.write(creds.to_json())
+
+
+def _load_creds():
+    """
+    Load stored credentials from the token file.
+
+    Returns None if no usable token is stored. A token.pickle left by
+    older versions is never unpickled; it is deleted and the user signs
+    in again.
+    """
+    from google.oauth2.credentials import Credentials
 
     if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, "rb") as token:
-            creds = pickle.load(token)
+        try:
+            with open(TOKEN_FILE, "r") as token:
+                return Credentials.from_authorized_user_info(json.load(token), SCOPES)
+        except (ValueError, IOError):
+            return None
+
+    LEGACY_TOKEN_FILE.unlink(missing_ok=True)
+    return None
+
+
+def _token_mtime():
+    """Return the token file's modification time, or None if it is missing."""
+    try:
+        return TOKEN_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _load_creds_cached():
+    """
+    Return stored credentials, reusing the in-process copy while the
+    token file has not changed on disk.
+    """
+    with _CREDS_LOCK:
+        mtime = _token_mtime()
+        if mtime is not None and mtime == _CREDS_CACHE["mtime"]:
+            return _CREDS_CACHE["creds"]
+
+        creds = _load_creds()
+        _CREDS_CACHE["mtime"] = _token_mtime()
+        _CREDS_CACHE["creds"] = creds
+        return creds
+
+
+def _store_creds(creds):
+    """Save credentials to disk and refresh the in-process copy."""
+    with _CREDS_LOCK:
+        _save_creds(creds)
+        _CREDS_CACHE["mtime"] = _token_mtime()
+        _CREDS_CACHE["creds"] = creds
+
+
+def _get_valid_creds():
+    """
+    Return stored credentials that are ready to use, refreshing an expired
+    access token with the refresh token instead of signing in again.
+
+    Returns None if there are no stored credentials or they can't be
+    refreshed.
+    """
+    creds = _load_creds_cached()
+
+    if creds and not creds.valid and creds.expired and creds.refresh_token:
+        import httplib2
+        from google_auth_httplib2 import Request
+
+        try:
+            creds.refresh(Request(httplib2.Http()))
+        except Exception as e:
+            print(f"Failed to refresh credentials: {e}")
+            return None
+        _store_creds(creds)
+
+    return creds if creds and creds.valid else None
+
+
+def _creds_key(creds):
+    """
+    Return a key identifying the account behind creds, derived from its
+    refresh token so the token itself is not kept as a dictionary key.
+    """
+    token = creds.refresh_token or creds.token or ""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _build_service(api, version, creds):
+    """
+    Return an API client for the given credentials, reusing a recently
+    built one for the same account.
+    """
+    key = (api, version, _creds_key(creds))
+    with _SERVICE_LOCK:
+        service = _SERVICE_CACHE.get(key)
+        if service is not None:
+            _SERVICE_CACHE.move_to_end(key)
+            return service
+
+    from googleapiclient.discovery import build
+
+    # Use the discovery documents bundled with googleapiclient so building a
+    # client never goes to the network; the on-disk discovery cache only
+    # applies to fetched documents, so it is turned off
+    service = build(
+        api,
+        version,
+        credentials=creds,
+        static_discovery=True,
+        cache_discovery=False
+    )
+    with _SERVICE_LOCK:
+        _SERVICE_CACHE[key] = service
+        if len(_SERVICE_CACHE) > SERVICE_CACHE_SIZE:
+            _SERVICE_CACHE.popitem(last=False)
+    return service
+
+
+def authenticate():
+    creds = _get_valid_creds()
+
+    if not creds:
+        from google_auth_oauthlib.flow import InstalledAppFlow
 
-    if not creds or not creds.valid:
         flow = InstalledAppFlow.from_client_secrets_file(
             str(CREDENTIALS_FILE), SCOPES
         )
         creds = flow.run_local_server(port=0)
+        _store_creds(creds)
+
+    return _build_service("gmail", "v1", creds)
+
 
-        with open(TOKEN_FILE, "wb") as token:
-            pickle.dump(creds, token)
+def new_authorized_http():
+    """
+    Return a new authorized HTTP object with its own connection pool.
 
-    return build("gmail", "v1", credentials=creds)
+    httplib2 is not thread-safe, so a service object may be shared between
+    worker threads only if each thread executes its requests with its own
+    HTTP object (passed as execute(http=...)). Keeping one per thread lets
+    every worker reuse its TLS connection across sends.
+    """
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+
+    creds = _load_creds_cached()
+    
+    if not creds:
+        raise Exception("Not authenticated. Please authenticate first.")
+    
+    return AuthorizedHttp(creds, http=httplib2.Http())
 
 
 def get_docs_service():
     """
     Returns a Google Docs API service object using existing credentials.
     """
-    creds = None
-    
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, "rb") as token:
-            creds = pickle.load(token)
+    creds = _get_valid_creds()
     
-    if not creds or not creds.valid:
+    if not creds:
         raise Exception("Not authenticated. Please authenticate first.")
     
-    return build("docs", "v1", credentials=creds)
+    return _build_service("docs", "v1", creds)
 
 
 def get_sheets_service():
     """
     Returns a Google Sheets API service object using existing credentials.
     """
-    creds = None
+    creds = _get_valid_creds()
     
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, "rb") as token:
-            creds = pickle.load(token)
-    
-    if not creds or not creds.valid:
+    if not creds:
         raise Exception("Not authenticated. Please authenticate first.")
     
-    return build("sheets", "v4", credentials=creds)
+    return _build_service("sheets", "v4", creds)
+
+
+def get_account_key():
+    """
+    Return a key identifying the signed-in grant, or None if nobody is
+    signed in. It is derived from the refresh token, so signing in again
+    changes it; state that must follow the account across sign-ins is
+    keyed by get_account_email instead.
+    """
+    creds = _load_creds_cached()
+    return _creds_key(creds) if creds else None
 
 
-def get_authenticated_user_email(service=None):
+def _save_user_email(email):
+    """Remember the signed-in account's address across app runs."""
+    account = get_account_key()
+    if account:
+        save_cache("user_email", {"account": account, "email": email})
+
+
+def get_cached_user_email():
+    """
+    Return the address saved by get_authenticated_user_email for the
+    signed-in account, or None if it isn't known yet.
+    
+    Lets the UI show the account without a Gmail round-trip.
+    """
+    saved = load_cache("user_email")
+    if not isinstance(saved, dict):
+        return None
+    account = get_account_key()
+    if account and saved.get("account") == account:
+        return saved.get("email")
+    return None
+
+
+def get_authenticated_user_email(service=None, http=None):
     """
     Returns the Gmail address of the currently authenticated user.
-    Requires a valid service object.
+    Requires a valid service object; pass an http from new_authorized_http
+    when calling from a worker thread.
     """
     from googleapiclient.errors import HttpError
 
     try:
         if service is None:
             return "Unknown"
+        if service in _USER_EMAIL_CACHE:
+            return _USER_EMAIL_CACHE[service]
         # Make the API call
-        profile = service.users().getProfile(userId="me").execute()
-        return profile.get("emailAddress", "Unknown")
+        profile = service.users().getProfile(userId="me").execute(http=http)
+        email = profile.get("emailAddress", "Unknown")
+        if email != "Unknown":
+            _USER_EMAIL_CACHE[service] = email
+            _save_user_email(email)
+        return email
     except HttpError as e:
         # Token might be invalid or expired
         print(f"Gmail API error: {e}")
@@ -94,3 +288,16 @@ def get_authenticated_user_email(service=None):
     except Exception as e:
         print(f"Unexpected error: {e}")
         return "Unknown"
+
+
+def get_account_email(service=None, http=None):
+    """
+    Return the signed-in account's address, or None if it can't be
+    determined. Uses the saved address when there is one, otherwise asks
+    Gmail like get_authenticated_user_email.
+    
+    Unlike get_account_key this stays the same when the account signs in
+    again, so it keys the daily send count and scheduled sends.
+    """
+    email = get_cached_user_email() or get_authenticated_user_email(service, http)
+    return None if email == "Unknown" else email
@@ -1,7 +1,19 @@
 import re
+from html import escape
 from auth import get_docs_service
 
 
+_DOC_URL_RE = re.compile(r'docs\.google\.com/document/d/([a-zA-Z0-9-_]+)')
+# Opening and closing tags for heading styles; other paragraphs become
+# <li> when they belong to a list and <p> otherwise
+_PARAGRAPH_TAGS = ('<p>', '</p>')
+_LIST_ITEM_TAGS = ('<li>', '</li>')
+_STYLE_TAGS = {f'HEADING_{i}': (f'<h{i}>', f'</h{i}>') for i in range(1, 7)}
+
+# Paragraph that marks the start of the subject or body section
+_SECTION_MARKER_RE = re.compile(r'^\s*===\s*(SUBJECT|BODY)\s*===\s*$', re.IGNORECASE)
+
+
 def extract_document_id(doc_input):
     """
     Extract document ID from either a Google Docs URL or direct ID.
@@ -10,9 +22,8 @@ def extract_document_id(doc_input):
     - https://docs.google.com/document/d/DOCUMENT_ID/edit
     - DOCUMENT_ID
     """
-    # Pattern to match Google Docs URL
-    url_pattern = r'docs\.google\.com/document/d/([a-zA-Z0-9-_]+)'
-    match = re.search(url_pattern, doc_input)
+    # Match Google Docs URL
+    match = _DOC_URL_RE.search(doc_input)
     
     if match:
         return match.group(1)
@@ -39,78 +50,75 @@ def read_google_doc(doc_input):
     
     try:
         docs_service = get_docs_service()
-        document = docs_service.documents().get(documentId=doc_id).execute()
+        # Only request the parts of the document that are parsed below
+        document = docs_service.documents().get(
+            documentId=doc_id,
+            fields='body/content,lists'
+        ).execute()
         
         content = document.get('body', {}).get('content', [])
         lists = document.get('lists', {})
         
-        # Extract both plain text and HTML
-        full_text = extract_text_from_content(content)
-        full_html = extract_html_from_content(content, lists)
-        
-        # Parse plain text for display in UI
-        subject_plain, body_plain = parse_doc_content_text(full_text)
-        
-        # Parse HTML for email sending
-        subject_html, body_html = parse_doc_content_html(full_html)
-        
-        return {
-            'subject': subject_plain,
-            'body': body_plain,
-            'body_html': body_html
-        }
+        # Split into sections while extracting text and HTML in one pass
+        return extract_doc_sections(content, lists)
     except Exception as e:
         raise Exception(f"Failed to read Google Doc: {str(e)}")
 
 
-def extract_text_from_content(content):
-    """
-    Extract plain text from Google Docs content structure.
+def extract_doc_sections(content, lists):
     """
-    text_parts = []
+    Walk the Google Docs content structure once, splitting it into the
+    Subject and Body sections and extracting text and formatted HTML.
     
-    for element in content:
-        if 'paragraph' in element:
-            paragraph = element['paragraph']
-            if 'elements' in paragraph:
-                for elem in paragraph['elements']:
-                    if 'textRun' in elem:
-                        text_content = elem['textRun'].get('content', '')
-                        text_parts.append(text_content)
-    
-    return ''.join(text_parts)
-
-
-def extract_html_from_content(content, lists):
-    """
-    Extract HTML from Google Docs content structure, preserving formatting.
+    Section markers (===SUBJECT=== / ===BODY===) are recognised as whole
+    paragraphs while walking, so the assembled text never has to be
+    searched again. Content before the first marker is ignored.
     
-    Supports:
+    HTML supports:
     - Bold, Italic, Underline, Strikethrough
     - Links
     - Headings (H1-H6)
     - Font sizes and colors
     - Bullet and numbered lists
     - Paragraphs and line breaks
+    
+    Returns a dict with 'subject' (plain text), 'body' (plain text),
+    and 'body_html' (formatted HTML) keys.
     """
-    html_parts = []
+    subject_parts = []
+    body_parts = []
+    body_html_parts = []
+    section = None
     
     for element in content:
-        if 'paragraph' in element:
-            paragraph = element['paragraph']
-            paragraph_html = convert_paragraph_to_html(paragraph, lists)
-            if paragraph_html:
-                html_parts.append(paragraph_html)
-    
-    return ''.join(html_parts)
+        if 'paragraph' not in element:
+            continue
+        
+        paragraph_text, paragraph_html = convert_paragraph(element['paragraph'], lists)
+        
+        marker = _SECTION_MARKER_RE.match(paragraph_text)
+        if marker:
+            section = marker.group(1).upper()
+        elif section == 'SUBJECT':
+            subject_parts.append(paragraph_text)
+        elif section == 'BODY':
+            body_parts.append(paragraph_text)
+            body_html_parts.append(paragraph_html)
+    
+    return {
+        'subject': ''.join(subject_parts).strip(),
+        'body': ''.join(body_parts).strip(),
+        'body_html': ''.join(body_html_parts).strip()
+    }
 
 
-def convert_paragraph_to_html(paragraph, lists):
+def convert_paragraph(paragraph, lists):
     """
-    Convert a Google Docs paragraph to HTML.
+    Convert a Google Docs paragraph to plain text and HTML.
+    Returns a (text, html) tuple.
     """
     if 'elements' not in paragraph:
-        return ''
+        return '', ''
     
     # Check if this is a list item
     bullet = paragraph.get('bullet')
@@ -121,163 +129,132 @@ def convert_paragraph_to_html(paragraph, lists):
     para_style = paragraph.get('paragraphStyle', {})
     named_style = para_style.get('namedStyleType', 'NORMAL_TEXT')
     
-    # Build the text content with inline formatting
-    text_html = ''
+    # Build the plain text and the text content with inline formatting
+    text_parts = []
+    html_parts = []
     for elem in paragraph['elements']:
         if 'textRun' in elem:
             text_run = elem['textRun']
             content = text_run.get('content', '')
             text_style = text_run.get('textStyle', {})
             
+            text_parts.append(content)
             # Apply formatting to this text run
-            formatted_text = apply_text_formatting(content, text_style)
-            text_html += formatted_text
+            html_parts.append(apply_text_formatting(content, text_style))
+    
+    text = ''.join(text_parts)
+    text_html = ''.join(html_parts)
     
     # Skip empty paragraphs (except if they're just newlines)
     if not text_html.strip():
-        return '<br>'
-    
-    # Wrap in appropriate HTML tag based on style
-    if named_style.startswith('HEADING_'):
-        level = named_style.split('_')[1]
-        return f'<h{level}>{text_html}</h{level}>'
-    elif list_id:
-        # List items - we'll wrap with <li>
-        # Note: This is a simplified approach. Full list handling would require
-        # tracking list start/end across multiple paragraphs
-        return f'<li>{text_html}</li>'
-    else:
-        return f'<p>{text_html}</p>'
+        return text, '<br>'
+    
+    # Wrap in appropriate HTML tag based on style.
+    # List items - we'll wrap with <li>
+    # Note: This is a simplified approach. Full list handling would require
+    # tracking list start/end across multiple paragraphs
+    tags = _STYLE_TAGS.get(named_style)
+    if tags is None:
+        tags = _LIST_ITEM_TAGS if list_id else _PARAGRAPH_TAGS
+    open_tag, close_tag = tags
+    return text, open_tag + text_html + close_tag
+
+
+def _rgb_css(optional_color):
+    """
+    Convert a Google Docs OptionalColor to a CSS rgb() value.
+    Returns None if the color has no RGB component.
+    """
+    rgb_color = optional_color.get('color', {}).get('rgbColor')
+    if not rgb_color:
+        return None
+    
+    get_channel = rgb_color.get
+    r = int(get_channel('red', 0) * 255)
+    g = int(get_channel('green', 0) * 255)
+    b = int(get_channel('blue', 0) * 255)
+    return f'rgb({r}, {g}, {b})'
 
 
 def apply_text_formatting(text, text_style):
     """
     Apply text formatting (bold, italic, color, etc.) to text.
-    Returns HTML string.
+    Returns HTML string with the text itself HTML-escaped.
     """
     if not text:
         return ''
     
+    # Plain runs between formatted spans have an empty style
+    if not text_style:
+        return escape(text, quote=False)
+    
+    get_style = text_style.get
+    
     # Build inline styles
     styles = []
     
     # Font size
-    if 'fontSize' in text_style:
-        size = text_style['fontSize'].get('magnitude', 11)
-        styles.append(f'font-size: {size}pt')
+    font_size = get_style('fontSize')
+    if font_size is not None:
+        styles.append(f"font-size: {font_size.get('magnitude', 11)}pt")
     
     # Text color
-    if 'foregroundColor' in text_style:
-        color = text_style['foregroundColor'].get('color', {})
-        rgb_color = color.get('rgbColor', {})
-        if rgb_color:
-            r = int(rgb_color.get('red', 0) * 255)
-            g = int(rgb_color.get('green', 0) * 255)
-            b = int(rgb_color.get('blue', 0) * 255)
-            styles.append(f'color: rgb({r}, {g}, {b})')
+    foreground = get_style('foregroundColor')
+    if foreground is not None:
+        rgb = _rgb_css(foreground)
+        if rgb:
+            styles.append(f'color: {rgb}')
     
     # Background color
-    if 'backgroundColor' in text_style:
-        color = text_style['backgroundColor'].get('color', {})
-        rgb_color = color.get('rgbColor', {})
-        if rgb_color:
-            r = int(rgb_color.get('red', 0) * 255)
-            g = int(rgb_color.get('green', 0) * 255)
-            b = int(rgb_color.get('blue', 0) * 255)
-            styles.append(f'background-color: rgb({r}, {g}, {b})')
+    background = get_style('backgroundColor')
+    if background is not None:
+        rgb = _rgb_css(background)
+        if rgb:
+            styles.append(f'background-color: {rgb}')
     
     # Font family
-    if 'fontFamily' in text_style:
-        font = text_style['fontFamily']
+    font = get_style('fontFamily')
+    if font is not None:
         styles.append(f'font-family: {font}')
     
     # Build style attribute
     style_attr = f' style="{"; ".join(styles)}"' if styles else ''
     
-    # Apply HTML tags for formatting
-    html = text
+    # Collect formatting tags from innermost to outermost
+    opens = []
+    closes = []
     
     # Bold
-    if text_style.get('bold'):
-        html = f'<strong>{html}</strong>'
+    if get_style('bold'):
+        opens.append('<strong>')
+        closes.append('</strong>')
     
     # Italic
-    if text_style.get('italic'):
-        html = f'<em>{html}</em>'
+    if get_style('italic'):
+        opens.append('<em>')
+        closes.append('</em>')
     
     # Underline
-    if text_style.get('underline'):
-        html = f'<u>{html}</u>'
+    if get_style('underline'):
+        opens.append('<u>')
+        closes.append('</u>')
     
     # Strikethrough
-    if text_style.get('strikethrough'):
-        html = f'<s>{html}</s>'
+    if get_style('strikethrough'):
+        opens.append('<s>')
+        closes.append('</s>')
     
     # Link
-    if 'link' in text_style:
-        url = text_style['link'].get('url', '')
+    link = get_style('link')
+    if link is not None:
+        url = link.get('url', '')
         if url:
-            html = f'<a href="{url}">{html}</a>'
+            opens.append(f'<a href="{escape(url)}">')
+            closes.append('</a>')
     
     # Wrap in span with styles if we have any
     if style_attr:
-        html = f'<span{style_attr}>{html}</span>'
+        opens.append(f'<span{style_attr}>')
+        closes.append('</span>')
     
-    return html
-
-
-def parse_doc_content_text(text):
-    """
-    Parse plain text to extract Subject and Body sections.
-    
-    Required format:
-    ===SUBJECT===
-    Your subject here
-    
-    ===BODY===
-    Your body here...
-    """
-    subject = ""
-    body = ""
-    
-    # Extract content after ===SUBJECT=== and before ===BODY===
-    subject_match = re.search(r'===\s*SUBJECT\s*===\s*\n(.+?)(?=\n\s*===\s*BODY\s*===|\Z)', text, re.DOTALL | re.IGNORECASE)
-    if subject_match:
-        subject = subject_match.group(1).strip()
-    
-    # Extract content after ===BODY===
-    body_match = re.search(r'===\s*BODY\s*===\s*\n(.+)', text, re.DOTALL | re.IGNORECASE)
-    if body_match:
-        body = body_match.group(1).strip()
-    
-    return subject, body
-
-
-def parse_doc_content_html(html):
-    """
-    Parse the document HTML to extract Subject and Body sections.
-    
-    Required format:
-    ===SUBJECT===
-    Your subject here
-    
-    ===BODY===
-    Your body here...
-    """
-    subject = ""
-    body = ""
-    
-    # Extract content after ===SUBJECT=== and before ===BODY===
-    subject_match = re.search(r'===\s*SUBJECT\s*===\s*</[^>]+>(.+?)(?=<[^>]+>===\s*BODY\s*===|\Z)', html, re.DOTALL | re.IGNORECASE)
-    if subject_match:
-        subject_html = subject_match.group(1).strip()
-        # Remove HTML tags and normalize whitespace for subject
-        subject = re.sub(r'<[^>]+>', ' ', subject_html).strip()
-        subject = re.sub(r'\s+', ' ', subject)  # Normalize whitespace
-    
-    # Extract content after ===BODY===
-    body_match = re.search(r'===\s*BODY\s*===\s*</[^>]+>(.+)', html, re.DOTALL | re.IGNORECASE)
-    if body_match:
-        body = body_match.group(1).strip()
-    
-    return subject, body
+    return ''.join(reversed(opens)) + escape(text, quote=False) + ''.join(closes)
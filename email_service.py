@@ -1,15 +1,420 @@
 import base64
-from email.mime.text import MIMEText
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.header import Header
+from email.utils import formataddr, parseaddr
+from html import escape
 
 
-def send_email(service, to, subject, body_html):
-    message = MIMEText(body_html, "html")
-    message["to"] = to
-    message["subject"] = subject
+# Maximum number of calls Google accepts in one batch request
+MAX_BATCH_SIZE = 100
 
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+# Batch requests sent at the same time; kept low because Gmail rejects
+# too many concurrent requests for one user
+MAX_CONCURRENT_BATCHES = 4
 
-    service.users().messages().send(
-        userId="me",
-        body={"raw": raw}
-    ).execute()
+# Default ceiling on sends started per second, across all threads
+DEFAULT_SEND_RATE = 20
+
+# Attempts per send when Gmail reports throttling, and the backoff
+# between them (seconds): 1s, 2s, 4s, ... capped at RETRY_MAX_DELAY
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Error text Gmail uses for per-user rate and quota limits
+_RATE_LIMIT_MARKERS = ("ratelimit", "rate limit", "quotaexceeded", "quota", "too many concurrent requests")
+
+# {{ name }} placeholders filled in per recipient
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# One recipient entry: runs of text up to a comma or semicolon, where a
+# quoted display name may itself contain either
+_RECIPIENT_RE = re.compile(r'(?:"[^"]*"|[^,;"])+')
+
+# Maps the standard base64 alphabet to the URL-safe one Gmail expects
+_URLSAFE_ALPHABET = bytes.maketrans(b"+/", b"-_")
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly so that at most rate_per_sec start each second.
+
+    Pacing sends up front keeps bursts under Gmail's per-user quota instead
+    of relying on backoff after the 429s arrive. Safe to share between threads.
+    """
+
+    def __init__(self, rate_per_sec):
+        self._lock = threading.Lock()
+        self._next_allowed_time = time.monotonic()
+        self.set_rate(rate_per_sec)
+
+    def set_rate(self, rate_per_sec):
+        """Change the number of calls allowed per second."""
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self._interval = 1.0 / rate_per_sec
+
+    def acquire(self):
+        """Block until the caller may make its call."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed_time - now
+            # Reserve the next slot, then sleep outside the lock
+            self._next_allowed_time = max(self._next_allowed_time, now) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size tuned by additive increase, multiplicative decrease.
+
+    The size is halved whenever Gmail throttles a batch and grows by one
+    after each batch that fully succeeds, staying within [minimum, maximum].
+    Healthy accounts keep large batches while throttled ones back off to
+    batches small enough to get through. Safe to share between threads.
+    """
+
+    def __init__(self, initial=MAX_BATCH_SIZE, minimum=1, maximum=MAX_BATCH_SIZE):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = max(minimum, min(initial, maximum))
+        self._lock = threading.Lock()
+
+    def record(self, throttled, succeeded):
+        """Adjust the size after a batch; succeeded means every send in it went through."""
+        with self._lock:
+            if throttled:
+                self.size = max(self.minimum, self.size // 2)
+            elif succeeded:
+                self.size = min(self.maximum, self.size + 1)
+
+
+# Shared by every send so concurrent batches respect one overall rate
+_limiter = RateLimiter(DEFAULT_SEND_RATE)
+
+
+def set_send_rate(rate_per_sec):
+    """Set the maximum number of sends started per second."""
+    _limiter.set_rate(rate_per_sec)
+
+
+def _encode_header(value):
+    """Encode a header value, using an RFC 2047 encoded-word for non-ASCII text."""
+    # Header values must stay on one line
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+
+def parse_recipients(lines):
+    """
+    Collect recipients from an iterable of lines in a single pass, so the
+    lines can be streamed rather than held in memory all at once.
+
+    Each line holds one address, or several separated by commas or
+    semicolons as they are usually pasted from a mail client.
+    Blank entries are ignored, and repeated addresses are dropped (compared
+    case-insensitively) so nobody is sent the same message twice. Entries
+    that do not hold a plausible address are collected separately.
+
+    Returns:
+        Tuple of (recipients, invalid) lists, each in input order
+    """
+    seen = set()
+    recipients = []
+    invalid = []
+    for line in lines:
+        for entry in _RECIPIENT_RE.findall(line):
+            entry = entry.strip()
+            if not entry:
+                continue
+            address = parseaddr(entry)[1]
+            local, at, domain = address.rpartition("@")
+            if not (local and at and "." in domain) or " " in address:
+                invalid.append(entry)
+                continue
+            key = address.lower()
+            if key not in seen:
+                seen.add(key)
+                recipients.append(entry)
+    return recipients, invalid
+
+
+def compile_personalized(body_html):
+    """
+    Split body_html at its {{ name }} placeholders, once per send.
+
+    Returns:
+        List alternating literal text (even indexes) and placeholder
+        names (odd indexes), or None if the body has no placeholders
+    """
+    parts = _PLACEHOLDER_RE.split(body_html)
+    return parts if len(parts) > 1 else None
+
+
+def recipient_values(to):
+    """Return the placeholder values for a recipient line such as 'Jane Doe <jane@example.com>'."""
+    name, address = parseaddr(to)
+    return {
+        "email": address,
+        "name": name,
+        "first_name": name.split()[0] if name else "",
+    }
+
+
+def render_personalized(parts, values):
+    """
+    Fill in parts from compile_personalized with values, HTML-escaped.
+    Placeholders without a value are left as written.
+    """
+    rendered = []
+    for index, part in enumerate(parts):
+        if index % 2 == 0:
+            rendered.append(part)
+        elif part in values:
+            rendered.append(escape(values[part]))
+        else:
+            rendered.append(f"{{{{{part}}}}}")
+    return "".join(rendered)
+
+
+def prepare_template(subject, body_html):
+    """
+    Serialize everything but the To header of a text/html message.
+
+    In a bulk send only the recipient changes, so the headers and the
+    base64-encoded body are built once and shared by every recipient.
+    """
+    return (
+        f"Subject: {_encode_header(subject)}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: text/html; charset="utf-8"\r\n'
+        "Content-Transfer-Encoding: base64\r\n"
+        "\r\n"
+    ).encode("ascii") + base64.encodebytes(body_html.encode("utf-8"))
+
+
+def build_raw_message(to, template):
+    """
+    Return the base64url-encoded RFC 5322 message Gmail expects in 'raw',
+    made by prepending a To header for this recipient to template.
+
+    Args:
+        to: Recipient address, optionally with a display name
+        template: Bytes from prepare_template
+    """
+    name, address = parseaddr(to)
+    if name:
+        to = formataddr((name, address), charset="utf-8")
+
+    message = f"To: {_encode_header(to)}\r\n".encode("ascii") + template
+    return base64.b64encode(message).translate(_URLSAFE_ALPHABET).decode("ascii")
+
+
+def is_rate_limited(error):
+    """
+    Return True if error is Gmail throttling the user (HTTP 429, or a 403
+    with a rateLimitExceeded/userRateLimitExceeded/quotaExceeded reason).
+
+    These failures are transient and worth retrying; anything else is not.
+    """
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status == 429:
+        return True
+    if status not in (None, 403):
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in _RATE_LIMIT_MARKERS)
+
+
+def _backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Seconds to wait before retry number attempt (0-based), with jitter."""
+    return min(cap, base * 2 ** attempt) + random.uniform(0, 0.5)
+
+
+def _execute_batch(service, chunk, indices, http=None):
+    """
+    Send chunk[index] for each index in indices as one batch request,
+    executed on http if given, otherwise on the service's own connection.
+
+    Returns:
+        Dict mapping each index to its error, or None on success
+    """
+    errors = {}
+
+    def on_response(request_id, response, exception):
+        errors[int(request_id)] = exception
+
+    batch = service.new_batch_http_request(callback=on_response)
+    for index in indices:
+        to, template = chunk[index]
+        if callable(template):
+            # Personalized message, rendered only when its batch is sent
+            template = template(to)
+        raw = build_raw_message(to, template)
+        # Every call in a batch counts against the per-user quota
+        _limiter.acquire()
+        batch.add(
+            service.users().messages().send(userId="me", body={"raw": raw}),
+            request_id=str(index)
+        )
+    try:
+        batch.execute(http=http)
+    except Exception as e:
+        # The batch request itself failed; fail every unanswered send
+        for index in indices:
+            errors.setdefault(index, e)
+
+    return errors
+
+
+def send_emails_batched(service, jobs, batch_size=MAX_BATCH_SIZE, on_result=None,
+                        max_attempts=RETRY_ATTEMPTS, http=None, sizer=None, cancel=None):
+    """
+    Send many emails using Gmail batch requests.
+
+    Up to batch_size sends are packed into a single multipart HTTP request,
+    so N emails cost ceil(N / batch_size) round-trips instead of N.
+    Sends Gmail rejects for rate limiting are retried with exponential
+    backoff, up to max_attempts times in total.
+
+    Args:
+        service: Authenticated Gmail service
+        jobs: Sequence of (to, template) tuples, template being bytes
+            from prepare_template or a callable returning them for to
+        batch_size: Sends per batch request (at most MAX_BATCH_SIZE)
+        on_result: Optional callback(to, error) invoked for each send;
+            error is None on success
+        max_attempts: Attempts per send while it keeps being throttled
+        http: Optional authorized HTTP object to execute the batches on
+        sizer: Optional AdaptiveBatchSize; when given it sets the size of
+            each batch instead of batch_size, and learns from the results
+        cancel: Optional threading.Event; once set, no further batch is
+            sent and the sends not yet made are left out of the results
+
+    Returns:
+        List of (to, error) tuples
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    results = []
+    start = 0
+
+    while start < len(jobs):
+        size = sizer.size if sizer else batch_size
+        chunk = jobs[start:start + size]
+        start += len(chunk)
+        pending = range(len(chunk))
+
+        for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(_backoff_delay(attempt - 1))
+
+            # Throttled sends are retried in batches of the reduced size
+            throttled = []
+            step = sizer.size if sizer else batch_size
+            for offset in range(0, len(pending), step):
+                if cancel and cancel.is_set():
+                    return results
+                errors = _execute_batch(service, chunk, pending[offset:offset + step], http)
+                if sizer:
+                    sizer.record(
+                        throttled=any(e is not None and is_rate_limited(e) for e in errors.values()),
+                        succeeded=all(e is None for e in errors.values())
+                    )
+
+                for index, error in errors.items():
+                    if error is not None and attempt < max_attempts - 1 and is_rate_limited(error):
+                        throttled.append(index)
+                        continue
+                    to = chunk[index][0]
+                    results.append((to, error))
+                    if on_result:
+                        on_result(to, error)
+
+            pending = throttled
+            if not pending:
+                break
+
+    return results
+
+
+def send_emails_bulk(service, http_factory, jobs, max_workers=MAX_CONCURRENT_BATCHES,
+                     batch_size=MAX_BATCH_SIZE, on_result=None, sizer=None, cancel=None):
+    """
+    Send many emails as batch requests run concurrently on a bounded
+    pool of worker threads.
+
+    Each worker repeatedly takes the next batch_size jobs (or sizer.size,
+    when a sizer is given) and sends them as one batch, so at most
+    max_workers batches are in flight at once. The service is shared, but
+    httplib2 is not thread-safe, so each worker creates its own HTTP
+    object with http_factory and reuses it (and its open connection) for
+    every batch it sends.
+
+    Args:
+        service: Authenticated Gmail service
+        http_factory: Callable returning a new authorized HTTP object
+        jobs: Sequence of (to, template) tuples, template being bytes
+            from prepare_template or a callable returning them for to
+        max_workers: Number of batch requests in flight at once
+        batch_size: Sends per batch request (at most MAX_BATCH_SIZE)
+        on_result: Optional callback(to, error) invoked as each send
+            finishes; error is None on success. Called from worker
+            threads, one call at a time.
+        sizer: Optional AdaptiveBatchSize shared by all workers
+        cancel: Optional threading.Event; once set, workers stop taking
+            new batches
+
+    Returns:
+        List of (to, error) tuples in completion order
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    results = []
+    report_lock = threading.Lock()
+    position = 0
+    position_lock = threading.Lock()
+
+    def report(to, error):
+        with report_lock:
+            results.append((to, error))
+            if on_result:
+                on_result(to, error)
+
+    def next_chunk():
+        nonlocal position
+        if cancel and cancel.is_set():
+            return []
+        size = sizer.size if sizer else batch_size
+        with position_lock:
+            chunk = jobs[position:position + size]
+            position += len(chunk)
+        return chunk
+
+    def worker():
+        try:
+            http = http_factory()
+        except Exception as e:
+            # Without a connection nothing can be sent from this worker
+            while chunk := next_chunk():
+                for to, _ in chunk:
+                    report(to, e)
+            return
+        while chunk := next_chunk():
+            send_emails_batched(
+                service, chunk, batch_size=len(chunk), on_result=report, http=http,
+                sizer=sizer, cancel=cancel
+            )
+
+    workers = min(max_workers, -(-len(jobs) // batch_size))
+    # The pool size is the in-flight bound, so no extra semaphore is needed
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for future in as_completed([executor.submit(worker) for _ in range(workers)]):
+            future.result()
+
+    return results
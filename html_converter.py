@@ -2,9 +2,45 @@
 HTML to Markdown and Markdown to HTML converters for rich text editing.
 """
 import re
+from functools import lru_cache
 from html import escape, unescape
 
 
+# html_to_markdown patterns
+_HTML_TAG_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)([^>]*)>')
+_HREF_RE = re.compile(r'href=["\'](.*?)["\']', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+
+# Markdown emitted for the opening and closing tag of each supported element
+_MARKDOWN_TAGS = {
+    'strong': ('**', '**'),
+    'b': ('**', '**'),
+    'em': ('*', '*'),
+    'i': ('*', '*'),
+    'u': ('__', '__'),
+    's': ('~~', '~~'),
+    'li': ('• ', '\n'),
+    'p': ('', '\n\n'),
+}
+_MARKDOWN_TAGS.update({f'h{i}': ('#' * i + ' ', '\n') for i in range(1, 7)})
+
+# markdown_to_html patterns
+_MD_HEADING_RES = [
+    (re.compile(r'^' + '#' * i + r'\s+(.+?)$', re.MULTILINE), f'<h{i}>\\1</h{i}>')
+    for i in range(6, 0, -1)  # Process from h6 to h1
+]
+_MD_BOLD_ITALIC_RE = re.compile(r'\*\*\*(.+?)\*\*\*')
+_MD_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*(.+?)\*')
+_MD_UNDERLINE_RE = re.compile(r'__(.+?)__')
+_MD_STRIKE_RE = re.compile(r'~~(.+?)~~')
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^\)]+)\)')
+_MD_BULLET_RE = re.compile(r'^[•\*\-]\s*')
+_BLOCK_START_RE = re.compile(r'^\s*<(h[1-6]|ul|ol|li|div|blockquote)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
 def html_to_markdown(html):
     """
     Convert HTML to Markdown-like syntax for easy editing.
@@ -13,60 +49,57 @@ def html_to_markdown(html):
     if not html:
         return ""
     
-    text = html
-    
-    # Convert headings
-    for i in range(1, 7):
-        text = re.sub(f'<h{i}[^>]*>(.*?)</h{i}>', lambda m: '#' * i + ' ' + m.group(1) + '\n', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert bold+italic combination (nested tags)
-    text = re.sub(r'<strong[^>]*>\s*<em[^>]*>(.*?)</em>\s*</strong>', r'***\1***', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<em[^>]*>\s*<strong[^>]*>(.*?)</strong>\s*</em>', r'***\1***', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<b[^>]*>\s*<i[^>]*>(.*?)</i>\s*</b>', r'***\1***', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<i[^>]*>\s*<b[^>]*>(.*?)</b>\s*</i>', r'***\1***', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert bold/strong
-    text = re.sub(r'<strong[^>]*>(.*?)</strong>', r'**\1**', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<b[^>]*>(.*?)</b>', r'**\1**', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert italic/em
-    text = re.sub(r'<em[^>]*>(.*?)</em>', r'*\1*', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<i[^>]*>(.*?)</i>', r'*\1*', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert underline
-    text = re.sub(r'<u[^>]*>(.*?)</u>', r'__\1__', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert strikethrough
-    text = re.sub(r'<s[^>]*>(.*?)</s>', r'~~\1~~', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert links
-    text = re.sub(r'<a[^>]*href=["\'](.*?)["\'][^>]*>(.*?)</a>', r'[\2](\1)', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert list items (simplified)
-    text = re.sub(r'<li[^>]*>(.*?)</li>', r'• \1\n', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert paragraphs to double newlines
-    text = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert line breaks
-    text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
+    # Walk the tags once, emitting Markdown markers in place of each tag.
+    # Unsupported tags are dropped but their content is kept.
+    parts = []
+    links = []
+    pos = 0
+    
+    for match in _HTML_TAG_RE.finditer(html):
+        parts.append(html[pos:match.start()])
+        pos = match.end()
+        closing, name, attrs = match.groups()
+        name = name.lower()
+        
+        if name == 'br':
+            parts.append('\n')
+        elif name == 'a':
+            # Links become [text](url); track hrefs so nested closes match up
+            if closing:
+                href = links.pop() if links else None
+                if href is not None:
+                    parts.append(f']({href})')
+            else:
+                href_match = _HREF_RE.search(attrs)
+                links.append(href_match.group(1) if href_match else None)
+                if href_match:
+                    parts.append('[')
+        else:
+            markers = _MARKDOWN_TAGS.get(name)
+            if markers:
+                parts.append(markers[1] if closing else markers[0])
     
-    # Remove remaining HTML tags but preserve content
-    text = re.sub(r'<[^>]+>', '', text)
+    parts.append(html[pos:])
+    text = ''.join(parts)
     
     # Unescape HTML entities
     text = unescape(text)
     
     # Clean up excessive newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _EXTRA_NEWLINES_RE.sub('\n\n', text)
     
     return text.strip()
 
 
+@lru_cache(maxsize=32)
 def markdown_to_html(markdown):
     """
     Convert Markdown-like syntax to HTML for email sending.
     Supports bold, italic, underline, links, headings, lists, etc.
+    
+    Results are cached: the preview and the send path convert the same
+    body, repeated sends usually reuse it unchanged, and undo/redo while
+    editing returns to recent versions of it.
     """
     if not markdown:
         return ""
@@ -74,27 +107,26 @@ def markdown_to_html(markdown):
     html = markdown
     
     # Convert headings (must be at start of line)
-    for i in range(6, 0, -1):  # Process from h6 to h1
-        pattern = r'^' + '#' * i + r'\s+(.+?)$'
-        html = re.sub(pattern, f'<h{i}>\\1</h{i}>', html, flags=re.MULTILINE)
+    for heading_re, replacement in _MD_HEADING_RES:
+        html = heading_re.sub(replacement, html)
     
     # Convert bold+italic: ***text*** (must be processed BEFORE ** and *)
-    html = re.sub(r'\*\*\*(.+?)\*\*\*', r'<strong><em>\1</em></strong>', html)
+    html = _MD_BOLD_ITALIC_RE.sub(r'<strong><em>\1</em></strong>', html)
     
     # Convert bold: **text**
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
+    html = _MD_BOLD_RE.sub(r'<strong>\1</strong>', html)
     
     # Convert italic: *text*
-    html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
+    html = _MD_ITALIC_RE.sub(r'<em>\1</em>', html)
     
     # Convert underline: __text__
-    html = re.sub(r'__(.+?)__', r'<u>\1</u>', html)
+    html = _MD_UNDERLINE_RE.sub(r'<u>\1</u>', html)
     
     # Convert strikethrough: ~~text~~
-    html = re.sub(r'~~(.+?)~~', r'<s>\1</s>', html)
+    html = _MD_STRIKE_RE.sub(r'<s>\1</s>', html)
     
     # Convert links: [text](url)
-    html = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', html)
+    html = _MD_LINK_RE.sub(r'<a href="\2">\1</a>', html)
     
     # Convert bullet points
     lines = html.split('\n')
@@ -108,7 +140,7 @@ def markdown_to_html(markdown):
                 processed_lines.append('<ul>')
                 in_list = True
             # Remove bullet and wrap in <li>
-            item_text = re.sub(r'^[•\*\-]\s*', '', stripped)
+            item_text = _MD_BULLET_RE.sub('', stripped)
             processed_lines.append(f'  <li>{item_text}</li>')
         else:
             if in_list:
@@ -129,7 +161,7 @@ def markdown_to_html(markdown):
         para = para.strip()
         if para:
             # Don't wrap if it's already a block element
-            if not re.match(r'^\s*<(h[1-6]|ul|ol|li|div|blockquote)', para, re.IGNORECASE):
+            if not _BLOCK_START_RE.match(para):
                 # Replace single newlines with <br> within paragraphs
                 para = para.replace('\n', '<br>')
                 html_paragraphs.append(f'<p>{para}</p>')
@@ -150,12 +182,12 @@ def strip_html_to_text(html):
         return ""
     
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', html)
+    text = _TAG_RE.sub('', html)
     
     # Unescape HTML entities
     text = unescape(text)
     
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     return text.strip()
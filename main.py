@@ -1,14 +1,22 @@
 import tkinter as tk
-import sv_ttk
-import darkdetect
 from ui import BulkMailerUI
+from utils import load_cache
 
 def main():
     root = tk.Tk()
-    
-    # Apply Sun Valley theme matching system theme
-    sv_ttk.set_theme(darkdetect.theme())
-    
+
+    # Apply Sun Valley theme: the saved choice, or the system theme
+    import sv_ttk
+
+    theme = load_cache("theme_preference", "System")
+    if theme == "System":
+        import darkdetect
+
+        # darkdetect returns None when the system theme can't be determined
+        theme = darkdetect.theme()
+    if theme:
+        sv_ttk.set_theme(theme.lower())
+
     BulkMailerUI(root)
     root.mainloop()
 
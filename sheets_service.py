@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from auth import get_sheets_service
 
 
@@ -24,26 +25,23 @@ def extract_spreadsheet_id(sheet_input):
 def get_sheet_columns(sheet_input):
     """
     Get the first row of the sheet to determine available columns.
+    Only the header row is requested.
     Returns a list of column headers.
     """
-    spreadsheet_id = extract_spreadsheet_id(sheet_input)
-    
     try:
+        spreadsheet_id = extract_spreadsheet_id(sheet_input)
         sheets_service = get_sheets_service()
         
-        # Get the first row to determine headers
         result = sheets_service.spreadsheets().values().get(
             spreadsheetId=spreadsheet_id,
-            range='A1:ZZ1'  # Get first row up to column ZZ
+            range='1:1',
+            fields='values',
+            valueRenderOption='UNFORMATTED_VALUE'
         ).execute()
         
         values = result.get('values', [])
-        
-        if not values:
-            return []
-        
-        # Return the headers from the first row
-        return values[0] if values else []
+        # Unformatted cells may be numbers; headers are shown as text
+        return [str(header) for header in values[0]] if values else []
         
     except Exception as e:
         raise Exception(f"Failed to read sheet columns: {str(e)}")
@@ -52,6 +50,7 @@ def get_sheet_columns(sheet_input):
 def read_column_from_sheet(sheet_input, column_letter):
     """
     Read all values from a specific column in a Google Sheet.
+    Only that column, below the header row, is requested.
     
     Args:
         sheet_input: Google Sheets URL or spreadsheet ID
@@ -60,26 +59,26 @@ def read_column_from_sheet(sheet_input, column_letter):
     Returns:
         List of email addresses (non-empty values from the column, excluding header)
     """
-    spreadsheet_id = extract_spreadsheet_id(sheet_input)
-    
     try:
+        spreadsheet_id = extract_spreadsheet_id(sheet_input)
         sheets_service = get_sheets_service()
         
-        # Read the entire column (skip first row which is the header)
-        range_name = f'{column_letter}2:{column_letter}'
-        
         result = sheets_service.spreadsheets().values().get(
             spreadsheetId=spreadsheet_id,
-            range=range_name
+            range=f'{column_letter}2:{column_letter}',
+            majorDimension='COLUMNS',
+            fields='values',
+            valueRenderOption='UNFORMATTED_VALUE'
         ).execute()
+        columns = result.get('values', [])
+        values = columns[0] if columns else []
         
-        values = result.get('values', [])
-        
-        if not values:
-            return []
-        
-        # Flatten the list and filter out empty values
-        emails = [row[0].strip() for row in values if row and row[0].strip()]
+        # Skip empty values
+        emails = []
+        for value in values:
+            value = str(value).strip()
+            if value:
+                emails.append(value)
         
         return emails
         
@@ -87,20 +86,22 @@ def read_column_from_sheet(sheet_input, column_letter):
         raise Exception(f"Failed to read column from sheet: {str(e)}")
 
 
+@lru_cache(maxsize=None)
 def column_number_to_letter(col_num):
     """
     Convert column number (0-indexed) to column letter.
     Example: 0 -> A, 1 -> B, 25 -> Z, 26 -> AA
+    
+    Results are cached; a sheet only has a few hundred columns at most.
     """
-    result = ""
+    letters = []
     col_num += 1  # Convert to 1-indexed
     
     while col_num > 0:
-        col_num -= 1
-        result = chr(col_num % 26 + ord('A')) + result
-        col_num //= 26
+        col_num, remainder = divmod(col_num - 1, 26)
+        letters.append(chr(remainder + 65))  # 65 == ord('A')
     
-    return result
+    return ''.join(reversed(letters))
 
 
 def column_letter_to_number(col_letter):
@@ -109,6 +110,7 @@ def column_letter_to_number(col_letter):
     Example: A -> 0, B -> 1, Z -> 25, AA -> 26
     """
     result = 0
-    for char in col_letter.upper():
-        result = result * 26 + (ord(char) - ord('A') + 1)
+    # Iterating bytes yields ints directly, avoiding an ord() call per char
+    for code in col_letter.upper().encode('ascii'):
+        result = result * 26 + (code - 64)  # 64 == ord('A') - 1
     return result - 1
@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import auth
+import utils
+from utils import load_sent_today, record_sent_today
+
+
+class AccountEmailTests(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the app cache in memory; nothing is written to disk
+        for name, value in (("_CACHE", {}), ("_FLUSH_TIMER", None), ("flush_cache", mock.Mock())):
+            patcher = mock.patch.object(utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.creds = SimpleNamespace(refresh_token="first-token", token="access")
+        patcher = mock.patch.object(auth, "_load_creds_cached", lambda: self.creds)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def get_profile_email(service=None, http=None):
+            # What Gmail's getProfile reports for this account
+            auth._save_user_email("me@example.com")
+            return "me@example.com"
+
+        patcher = mock.patch.object(auth, "get_authenticated_user_email", side_effect=get_profile_email)
+        self.get_profile_email = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_relogin_with_new_refresh_token_keeps_sent_count(self):
+        first_key = auth.get_account_key()
+        record_sent_today(auth.get_account_email(), 120)
+
+        # Logging out forgets the saved address; signing in again issues a
+        # new refresh token for the same account
+        utils.save_cache("user_email", None)
+        self.creds = SimpleNamespace(refresh_token="second-token", token="access")
+
+        self.assertNotEqual(auth.get_account_key(), first_key)
+        self.assertEqual(auth.get_account_email(), "me@example.com")
+        self.assertEqual(load_sent_today(auth.get_account_email()), 120)
+
+    def test_saved_address_skips_gmail(self):
+        auth.get_account_email()
+        self.assertEqual(auth.get_account_email(), "me@example.com")
+        self.assertEqual(self.get_profile_email.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+import email_service
+from email_service import AdaptiveBatchSize, send_emails_batched
+
+
+class SendEmailsBatchedTests(unittest.TestCase):
+
+    def test_throttled_retry_uses_reduced_batch_size(self):
+        batches = []
+
+        def fake_execute_batch(service, chunk, indices, http=None):
+            indices = list(indices)
+            batches.append(indices)
+            if len(batches) == 1:
+                # Gmail throttles every send in the first batch
+                return {index: Exception("rateLimitExceeded") for index in indices}
+            return {index: None for index in indices}
+
+        jobs = [(f"user{i}@example.com", b"") for i in range(8)]
+        sizer = AdaptiveBatchSize(initial=8)
+
+        with mock.patch.object(email_service, "_execute_batch", fake_execute_batch), \
+                mock.patch.object(email_service.time, "sleep"):
+            results = send_emails_batched(None, jobs, sizer=sizer)
+
+        self.assertEqual(batches[0], list(range(8)))
+        self.assertTrue(all(len(batch) <= 4 for batch in batches[1:]))
+        self.assertEqual(sorted(index for batch in batches[1:] for index in batch), list(range(8)))
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(error is None for _, error in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+import utils
+from utils import load_sent_today, record_sent_today
+
+
+class SentTodayTests(unittest.TestCase):
+
+    def setUp(self):
+        # Keep the app cache in memory; nothing is written to disk
+        for name, value in (("_CACHE", {}), ("_FLUSH_TIMER", None), ("flush_cache", mock.Mock())):
+            patcher = mock.patch.object(utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_counts_are_kept_per_account(self):
+        record_sent_today("a@example.com", 3)
+        record_sent_today("b@example.com", 5)
+        record_sent_today("a@example.com", 2)
+        self.assertEqual(load_sent_today("a@example.com"), 5)
+        self.assertEqual(load_sent_today("b@example.com"), 5)
+
+    def test_counts_reset_on_a_new_day(self):
+        utils.save_cache("sent_today", {"date": "2000-01-01", "counts": {"a@example.com": 9}})
+        self.assertEqual(load_sent_today("a@example.com"), 0)
+        record_sent_today("a@example.com", 1)
+        self.assertEqual(load_sent_today("a@example.com"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,8 +47,9 @@ class AuthFrame:
             font=("Helvetica", 16)
         ).pack(pady=(0, 30))
 
-        # Check if credentials file already exists
-        if credentials_file_exists():
+        # Check once whether the credentials file already exists
+        has_credentials = credentials_file_exists()
+        if has_credentials:
             status_text = "✓ Credentials file loaded"
         else:
             status_text = "⚠ No credentials file found"
@@ -73,7 +74,7 @@ class AuthFrame:
             center_frame,
             text="🔐 Authenticate with Google",
             command=self.handle_auth,
-            state="normal" if credentials_file_exists() else "disabled"
+            state="normal" if has_credentials else "disabled"
         )
         self.auth_button.pack(pady=10, fill="x")
 
@@ -97,10 +98,8 @@ class AuthFrame:
             return  # User cancelled
         
         try:
-            # Ensure the directory exists
-            CREDENTIALS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Copy the selected file to the app's data directory
+            # Copy the selected file to the app's data directory, which
+            # get_app_data_dir already created when CREDENTIALS_FILE was resolved
             shutil.copy2(file_path, CREDENTIALS_FILE)
             
             # Update UI
@@ -3,22 +3,49 @@
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 import threading
-import sv_ttk
-import darkdetect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
-from auth import get_authenticated_user_email, TOKEN_FILE
-from email_service import send_email
-from utils import save_cache, load_cache
-from html_converter import markdown_to_html
+from auth import (
+    get_account_email, get_authenticated_user_email, get_cached_user_email, new_authorized_http, TOKEN_FILE
+)
+from email_service import (
+    compile_personalized, parse_recipients, prepare_template, recipient_values, render_personalized,
+    send_emails_bulk, set_send_rate, AdaptiveBatchSize, DEFAULT_SEND_RATE, MAX_BATCH_SIZE
+)
+from utils import (
+    save_cache, load_cache, save_pending_send, load_pending_send, load_sent_today, record_sent_today
+)
 
 from .google_docs_panel import GoogleDocsPanel
 from .google_sheets_panel import GoogleSheetsPanel
 from .preview_panel import PreviewPanel
 
 
+# Minimum seconds between progress redraws while sending (~10 Hz)
+PROGRESS_INTERVAL = 0.1
+
+# Lines read from the recipients box per Tk call
+RECIPIENT_READ_LINES = 1000
+
+# Recipients sent per day by default, under Gmail's limit of about 500
+# a day for free accounts
+DEFAULT_DAILY_LIMIT = 450
+
+
 class EmailFrame:
     """Handles the main email composition UI."""
     
+    __slots__ = (
+        "root", "service", "on_logout",
+        "email_frame", "account_email", "account_label", "theme_var", "theme_combo",
+        "subject_entry", "body_text", "body_paned", "recipients_text",
+        "send_button", "rate_var", "daily_limit_var", "pending_job", "send_executor",
+        "send_cancel", "progress_label", "progress_bar", "error_log", "preview_button",
+        "docs_panel", "sheets_panel", "preview_panel"
+    )
+    
     def __init__(self, root, service, on_logout):
         """
         Initialize the email composition frame.
@@ -33,6 +60,9 @@ class EmailFrame:
         self.on_logout = on_logout
         
         self.email_frame = None
+        # Address of the signed-in account, once known; keys the daily
+        # send count and scheduled sends
+        self.account_email = None
         self.account_label = None
         self.theme_var = None
         self.theme_combo = None
@@ -41,8 +71,16 @@ class EmailFrame:
         self.body_paned = None
         self.recipients_text = None
         self.send_button = None
+        self.rate_var = None
+        self.daily_limit_var = None
+        self.pending_job = None
+        # One long-lived worker runs sends, one after another
+        self.send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="send")
+        # Set on teardown to stop a send in progress
+        self.send_cancel = threading.Event()
         self.progress_label = None
         self.progress_bar = None
+        self.error_log = None
         self.preview_button = None
         
         # Component references
@@ -54,8 +92,9 @@ class EmailFrame:
     
     def create_ui(self):
         """Create the email composition UI."""
+        # Built while unmapped and packed once at the end, so the widgets
+        # below cost one layout pass instead of one per pack
         self.email_frame = ttk.Frame(self.root)
-        self.email_frame.pack(fill="both", expand=True)
 
         # Header with account info and logout
         self._create_header()
@@ -84,30 +123,75 @@ class EmailFrame:
         # Send button and progress
         self._create_send_section(content_frame)
         
+        # Offer to continue a send that an earlier session split across days;
+        # if the account address is still loading, that happens once it arrives
+        if self._load_own_pending():
+            self.root.after_idle(self._offer_pending_send)
+        
         # Update docs panel references
         self.docs_panel.subject_entry = self.subject_entry
         self.docs_panel.body_text = self.body_text
         self.docs_panel.update_preview_callback = self.preview_panel.update_preview
         
-        # Enable mousewheel scrolling
+        # Enable mousewheel scrolling while the pointer is over the content;
+        # a burst of wheel events is applied as a single scroll
+        wheel = {"units": 0, "pending": False}
+        
+        def apply_scroll():
+            units, wheel["units"], wheel["pending"] = wheel["units"], 0, False
+            if units:
+                canvas.yview_scroll(units, "units")
+        
         def on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+            # X11 reports the wheel as buttons 4 (up) and 5 (down)
+            if event.num == 4:
+                wheel["units"] -= 1
+            elif event.num == 5:
+                wheel["units"] += 1
+            else:
+                wheel["units"] += int(-1*(event.delta/120))
+            if not wheel["pending"]:
+                wheel["pending"] = True
+                canvas.after_idle(apply_scroll)
+        
+        wheel_events = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+        
+        def on_enter(event):
+            for sequence in wheel_events:
+                canvas.bind_all(sequence, on_mousewheel)
+        
+        def on_leave(event):
+            # Moving onto a widget inside the canvas also counts as leaving it
+            widget = canvas.winfo_containing(event.x_root, event.y_root)
+            inside = widget is not None and (
+                widget == canvas or str(widget).startswith(str(canvas) + ".")
+            )
+            if not inside:
+                for sequence in wheel_events:
+                    canvas.unbind_all(sequence)
+        
+        canvas.bind("<Enter>", on_enter)
+        canvas.bind("<Leave>", on_leave)
         
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        self.email_frame.pack(fill="both", expand=True)
     
     def _create_header(self):
         """Create the header with account info, theme selector, and logout button."""
         header_frame = ttk.Frame(self.email_frame)
         header_frame.pack(fill="x", side="top", pady=(0, 10))
 
-        # Account email display
-        account_email = get_authenticated_user_email(self.service)
+        # Account email display; saved from an earlier session when possible,
+        # otherwise fetched in the background so the frame shows at once
+        account_email = self.account_email = get_cached_user_email()
         self.account_label = ttk.Label(
             header_frame,
-            text=f"👤 {account_email}",
+            text=f"👤 {account_email or 'Loading…'}",
             font=("Helvetica", 11)
         )
         self.account_label.pack(side="left", padx=20, pady=15)
+        
+        if not account_email:
+            threading.Thread(target=self._fetch_account_email, daemon=True).start()
 
         # Theme selector
         theme_frame = ttk.Frame(header_frame)
@@ -144,6 +228,27 @@ class EmailFrame:
         )
         logout_btn.pack(side="right", padx=20, pady=15)
     
+    def _fetch_account_email(self):
+        """Look up the account address on a worker thread and show it."""
+        try:
+            # The shared service's own connection belongs to the Tk thread
+            http = new_authorized_http()
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            email = "Unknown"
+        else:
+            email = get_authenticated_user_email(self.service, http)
+        self.root.after(0, self._show_account_email, email)
+    
+    def _show_account_email(self, email):
+        """Show the account address; must run on the Tk thread."""
+        if not self.account_label.winfo_exists():
+            return
+        self.account_label.config(text=f"👤 {email}")
+        if email != "Unknown":
+            self.account_email = email
+            self._offer_pending_send()
+    
     def _create_scrollable_canvas(self):
         """Create and return the scrollable canvas and content frame."""
         canvas_frame = ttk.Frame(self.email_frame)
@@ -163,14 +268,30 @@ class EmailFrame:
         # Create window in canvas
         canvas_window = canvas.create_window((0, 0), window=content_frame, anchor="nw")
         
-        # Update scroll region when content changes
-        def on_frame_configure(event=None):
+        # Update scroll region when content changes, once per idle cycle
+        # however many child widgets resized in it
+        pending = {"configure": False}
+        
+        def on_frame_configure():
+            pending["configure"] = False
             canvas.configure(scrollregion=canvas.bbox("all"))
-            # Also update window width to match canvas
-            canvas.itemconfig(canvas_window, width=canvas.winfo_width())
         
-        content_frame.bind("<Configure>", on_frame_configure)
-        canvas.bind("<Configure>", lambda e: canvas.itemconfig(canvas_window, width=e.width))
+        def schedule_frame_configure(event=None):
+            if not pending["configure"]:
+                pending["configure"] = True
+                canvas.after_idle(on_frame_configure)
+        
+        # Keep the content as wide as the canvas; only a width change
+        # needs a new layout, not every move or height change
+        last_width = {"width": 0}
+        
+        def on_canvas_configure(event):
+            if event.width != last_width["width"]:
+                last_width["width"] = event.width
+                canvas.itemconfig(canvas_window, width=event.width)
+        
+        content_frame.bind("<Configure>", schedule_frame_configure)
+        canvas.bind("<Configure>", on_canvas_configure)
         
         return canvas, content_frame
     
@@ -249,9 +370,6 @@ class EmailFrame:
         )
         self.body_text.pack(fill="both", expand=True)
         
-        # Bind text change event to detect edits
-        self.body_text.bind("<<Modified>>", self.on_body_text_modified)
-        
         # Add left frame to paned window
         self.body_paned.add(left_frame)
         
@@ -317,6 +435,41 @@ class EmailFrame:
         )
         self.send_button.pack(fill="x", padx=20, pady=10)
 
+        # Send rate setting
+        rate_frame = ttk.Frame(send_frame)
+        rate_frame.pack(pady=(0, 5))
+        
+        ttk.Label(
+            rate_frame,
+            text="Max emails per second:",
+            font=("Helvetica", 10)
+        ).pack(side="left", padx=(0, 5))
+        
+        self.rate_var = tk.IntVar(value=load_cache("send_rate", DEFAULT_SEND_RATE))
+        ttk.Spinbox(
+            rate_frame,
+            from_=1,
+            to=100,
+            textvariable=self.rate_var,
+            width=5
+        ).pack(side="left")
+        
+        ttk.Label(
+            rate_frame,
+            text="Max emails per day:",
+            font=("Helvetica", 10)
+        ).pack(side="left", padx=(15, 5))
+        
+        self.daily_limit_var = tk.IntVar(value=load_cache("daily_limit", DEFAULT_DAILY_LIMIT))
+        ttk.Spinbox(
+            rate_frame,
+            from_=1,
+            to=10000,
+            increment=50,
+            textvariable=self.daily_limit_var,
+            width=6
+        ).pack(side="left")
+
         # Progress label
         self.progress_label = ttk.Label(
             send_frame,
@@ -331,7 +484,16 @@ class EmailFrame:
             length=400,
             mode="determinate"
         )
-        self.progress_bar.pack(pady=(0, 20))
+        self.progress_bar.pack(pady=(0, 10))
+
+        # Failed sends are listed here instead of one dialog per failure
+        self.error_log = scrolledtext.ScrolledText(
+            send_frame,
+            height=4,
+            font=("Helvetica", 10),
+            state="disabled"
+        )
+        self.error_log.pack(fill="x", padx=20, pady=(0, 20))
     
     def on_theme_change(self, event=None):
         """Handle theme selection change."""
@@ -340,13 +502,19 @@ class EmailFrame:
         # Save preference
         save_cache("theme_preference", selected_theme)
         
-        # Apply theme
+        # Apply theme; the theme packages are only loaded once needed
+        import sv_ttk
+        
         if selected_theme == "System":
-            theme = darkdetect.theme()  # Returns "dark" or "light"
-            if theme:
-                sv_ttk.set_theme(theme)
+            import darkdetect
+            
+            theme = darkdetect.theme()  # Returns "Dark" or "Light"
         else:
-            sv_ttk.set_theme(selected_theme.lower())
+            theme = selected_theme
+        
+        # Re-applying the current theme would rebuild every ttk style for nothing
+        if theme and theme.lower() != sv_ttk.get_theme():
+            sv_ttk.set_theme(theme.lower())
         
         # Remove focus and clear selection from combobox
         self.theme_combo.selection_clear()
@@ -354,11 +522,24 @@ class EmailFrame:
     
     def handle_logout(self):
         """Handle logout button click."""
-        confirm = messagebox.askyesno("Logout", "Are you sure you want to logout?")
+        message = "Are you sure you want to logout?"
+        pending = self._load_own_pending()
+        if pending:
+            message += (
+                f"\n\n{len(pending['recipients'])} recipients are still scheduled for "
+                f"{pending['send_on']}; logging out cancels that send."
+            )
+        confirm = messagebox.askyesno("Logout", message)
         if confirm:
-            # Delete token
-            if TOKEN_FILE.exists():
-                TOKEN_FILE.unlink()
+            # Delete token and the saved account address off the UI thread;
+            # a slow filesystem or virus scanner must not freeze the window,
+            # and nothing reads them again until the next login
+            def forget_account():
+                TOKEN_FILE.unlink(missing_ok=True)
+                save_cache("user_email", None)
+                save_pending_send(None)
+            
+            threading.Thread(target=forget_account, daemon=True).start()
             self.service = None
             self.destroy()
             messagebox.showinfo("Logged out", "You have been logged out successfully.")
@@ -367,66 +548,352 @@ class EmailFrame:
     def confirm_send(self):
         """Confirm before sending emails."""
         subject = self.subject_entry.get().strip()
-        body = self.body_text.get("1.0", tk.END).strip()
-        recipients = self.get_recipients()
+        body = self.body_text.get("1.0", "end-1c").strip()
+
+        # Check the cheap fields before reading a possibly long recipient list
+        if not subject or not body:
+            messagebox.showwarning("Missing data", "Subject, body, and recipients are required.")
+            return
 
-        if not subject or not body or not recipients:
+        recipients, invalid = self.get_recipients()
+        if not recipients:
             messagebox.showwarning("Missing data", "Subject, body, and recipients are required.")
             return
 
-        confirm = messagebox.askyesno(
+        if invalid:
+            shown = "\n".join(invalid[:10])
+            if len(invalid) > 10:
+                shown += f"\n... and {len(invalid) - 10} more"
+            messagebox.showinfo(
+                "Invalid recipients",
+                f"Skipping {len(invalid)} invalid address(es):\n{shown}"
+            )
+
+        # The daily count and any scheduled send belong to the account's address
+        if not self.account_email:
+            self.account_email = get_account_email(self.service)
+        if not self.account_email:
+            messagebox.showerror(
+                "Account unknown",
+                "Couldn't look up the address of the signed-in account, which the daily "
+                "limit is counted for. Check your connection and try again."
+            )
+            return
+
+        # The limit covers everything this account sent today, not just this send
+        daily_limit = self._read_int_setting(self.daily_limit_var, "daily_limit", DEFAULT_DAILY_LIMIT)
+        allowance = self._daily_allowance(daily_limit)
+        later = []
+        if len(recipients) > allowance:
+            used = daily_limit - allowance
+            if allowance:
+                choice = messagebox.askyesnocancel(
+                    "Daily limit",
+                    f"{len(recipients)} recipients is more than the {allowance} left of the "
+                    f"daily limit of {daily_limit} ({used} already sent today).\n\n"
+                    f"Yes: send to {allowance} today and the rest on the following days\n"
+                    f"No: send only to the first {allowance}\n"
+                    "Cancel: don't send"
+                )
+            else:
+                # askyesno gives False for no; treat it like cancel
+                choice = messagebox.askyesno(
+                    "Daily limit",
+                    f"The daily limit of {daily_limit} emails has been reached.\n\n"
+                    f"Send to all {len(recipients)} recipients on the following days instead?"
+                ) or None
+            if choice is None:
+                return
+            if choice:
+                later = recipients[allowance:]
+                # Only one send can be scheduled; never drop the old one unasked
+                if not self._confirm_replace_pending():
+                    return
+            recipients = recipients[:allowance]
+
+        # With nothing left for today, agreeing to schedule was the confirmation
+        confirm = not recipients or messagebox.askyesno(
             "Confirm Send",
             f"Send email to {len(recipients)} recipients?"
         )
 
         if confirm:
-            self.send_emails(subject, body, recipients)
+            set_send_rate(self._read_int_setting(self.rate_var, "send_rate", DEFAULT_SEND_RATE))
+            if later:
+                save_pending_send({
+                    "account": self.account_email,
+                    "subject": subject,
+                    "body": body,
+                    "recipients": later,
+                    "send_on": (date.today() + timedelta(days=1)).isoformat()
+                })
+                self._schedule_pending_send()
+            if recipients:
+                self.send_emails(subject, body, recipients)
+    
+    def _confirm_replace_pending(self):
+        """
+        Ask before a new scheduled send replaces the one already pending.
+        
+        Returns:
+            True if nothing is pending or the user agreed to replace it
+        """
+        pending = self._load_own_pending()
+        if not pending:
+            return True
+        return messagebox.askyesno(
+            "Scheduled send pending",
+            f"{len(pending['recipients'])} recipients of \"{pending['subject']}\" are still "
+            f"scheduled for {pending['send_on']}.\n\n"
+            "Replace that scheduled send with this one? Its remaining recipients "
+            "will not be sent.",
+            icon="warning"
+        )
+    
+    def _daily_allowance(self, daily_limit):
+        """Return how many more emails may be sent today under daily_limit."""
+        return max(0, daily_limit - load_sent_today(self.account_email))
+    
+    def _read_int_setting(self, var, cache_key, default):
+        """Return a positive int setting from var, falling back to default, and save it."""
+        try:
+            value = var.get()
+        except tk.TclError:
+            value = default
+        if value < 1:
+            value = default
+        var.set(value)
+        
+        save_cache(cache_key, value)
+        return value
+    
+    def _load_own_pending(self):
+        """Return the pending send if it belongs to the signed-in account, else None."""
+        pending = load_pending_send()
+        if pending and self.account_email and pending.get("account") == self.account_email:
+            return pending
+        return None
+    
+    def _offer_pending_send(self):
+        """Ask whether to continue a send scheduled in an earlier session."""
+        pending = self._load_own_pending()
+        if not pending:
+            return
+        
+        overdue = date.fromisoformat(pending["send_on"]) <= date.today()
+        choice = messagebox.askyesnocancel(
+            "Scheduled send",
+            f"{len(pending['recipients'])} recipients of \"{pending['subject']}\" are still "
+            f"scheduled for {pending['send_on']}.\n\n"
+            f"Yes: continue this send{' now' if overdue else ''}\n"
+            "No: discard the remaining recipients\n"
+            "Cancel: decide next time"
+        )
+        if choice is None:
+            return
+        if choice:
+            self._schedule_pending_send()
+        else:
+            save_pending_send(None)
+    
+    def _schedule_pending_send(self):
+        """Arrange for the saved pending send to continue on its scheduled day."""
+        pending = self._load_own_pending()
+        if not pending:
+            return
+        
+        send_on = date.fromisoformat(pending["send_on"])
+        delay = datetime.combine(send_on, datetime.min.time()) - datetime.now()
+        delay_ms = max(0, int(delay.total_seconds() * 1000))
+        
+        if self.pending_job:
+            self.root.after_cancel(self.pending_job)
+        self.pending_job = self.root.after(delay_ms, self._resume_pending_send)
+        
+        self.progress_label.config(
+            text=f"{len(pending['recipients'])} recipients scheduled for {send_on:%Y-%m-%d}"
+        )
+    
+    def _resume_pending_send(self):
+        """Send today's share of the pending recipients and reschedule the rest."""
+        self.pending_job = None
+        pending = self._load_own_pending()
+        if not pending:
+            return
+        
+        # Another send is still running; try again shortly
+        if str(self.send_button["state"]) == "disabled":
+            self.pending_job = self.root.after(60_000, self._resume_pending_send)
+            return
+        
+        daily_limit = self._read_int_setting(self.daily_limit_var, "daily_limit", DEFAULT_DAILY_LIMIT)
+        allowance = self._daily_allowance(daily_limit)
+        recipients = pending["recipients"]
+        
+        # Today's limit is already used up; wait for tomorrow
+        if not allowance:
+            pending["send_on"] = (date.today() + timedelta(days=1)).isoformat()
+            save_pending_send(pending)
+            self._schedule_pending_send()
+            return
+        
+        today, later = recipients[:allowance], recipients[allowance:]
+        
+        # Save the remainder first so a crash mid-send doesn't resend today's share
+        if later:
+            pending["recipients"] = later
+            pending["send_on"] = (date.today() + timedelta(days=1)).isoformat()
+            save_pending_send(pending)
+        else:
+            save_pending_send(None)
+        
+        set_send_rate(self._read_int_setting(self.rate_var, "send_rate", DEFAULT_SEND_RATE))
+        self.send_emails(pending["subject"], pending["body"], today)
+        if later:
+            self._schedule_pending_send()
     
     def send_emails(self, subject, body, recipients):
         """Send emails to all recipients."""
+        total = len(recipients)
+
+        # Reset progress bar; the worker only touches widgets through root.after
+        self.progress_bar["maximum"] = total
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="")
+        self.send_button.config(state="disabled")
+        self.error_log.configure(state="normal")
+        self.error_log.delete("1.0", tk.END)
+        self.error_log.configure(state="disabled")
+        # Counted against the account that started the send, even if it
+        # logs out before the send stops
+        account = self.account_email
+
         def task():
-            total = len(recipients)
             sent = 0
-
-            # Reset progress bar
-            self.progress_bar["maximum"] = total
-            self.progress_bar["value"] = 0
-            self.progress_label.config(text="")
-            self.send_button.config(state="disabled")
-            self.root.update_idletasks()
+            failure = None
             
-            # Convert current Markdown text to HTML for sending
-            body_to_send = markdown_to_html(body)
+            try:
+                from html_converter import markdown_to_html
+                
+                # Convert current Markdown text to HTML and build the message once;
+                # each recipient only adds its own To header
+                body_html = markdown_to_html(body)
+                parts = compile_personalized(body_html)
+                if parts is None:
+                    template = prepare_template(subject, body_html)
+                else:
+                    # {{ name }} placeholders: split the body once, fill it per recipient
+                    def template(email):
+                        return prepare_template(subject, render_personalized(parts, recipient_values(email)))
 
-            for i, email in enumerate(recipients, start=1):
-                try:
-                    send_email(self.service, email, subject, body_to_send)
-                    sent += 1
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to send to {email}\n{e}")
-                finally:
-                    # Update progress
-                    self.progress_bar["value"] = i
-                    self.progress_label.config(text=f"Sending email {i} / {total}")
-                    self.root.update_idletasks()
+                jobs = [(email, template) for email in recipients]
+                done = 0
+                last_post = 0.0
+                
+                def on_result(email, error):
+                    nonlocal sent, done, last_post
+                    done += 1
+                    if error is None:
+                        sent += 1
+                    else:
+                        self.root.after(0, self._log_error, f"{email}: {error}")
+                    
+                    # Redraw at a bounded rate rather than once per email; the
+                    # final "Done!" update below always lands the bar at total
+                    now = time.monotonic()
+                    if now - last_post >= PROGRESS_INTERVAL:
+                        last_post = now
+                        self.root.after(0, self._post_progress, done, total, f"Sending email {done} / {total}")
+                
+                # Up to 100 sends share one HTTP round-trip, and a few of those
+                # batches run in parallel, each worker on its own connection.
+                # The batch size shrinks while Gmail throttles and grows back
+                # on success, starting from the size that last worked.
+                sizer = AdaptiveBatchSize(load_cache("batch_size", MAX_BATCH_SIZE))
+                send_emails_bulk(
+                    self.service, new_authorized_http, jobs, on_result=on_result, sizer=sizer,
+                    cancel=self.send_cancel
+                )
+                save_cache("batch_size", sizer.size)
 
-            self.send_button.config(state="normal")
-            self.progress_label.config(text=f"Done! Sent {sent}/{total} emails.")
+                self.root.after(0, self._post_progress, total, total, f"Done! Sent {sent}/{total} emails.")
+            except Exception as e:
+                print(f"Unexpected error while sending: {e!r}")
+                failure = e
+            finally:
+                record_sent_today(account, sent)
+                # Always re-enable sending, however the send ended
+                self.root.after(0, self._finish_send, sent, total, failure)
 
-        threading.Thread(target=task).start()
+        self.send_executor.submit(task)
+    
+    def _post_progress(self, done, total, status):
+        """Show send progress; must run on the Tk thread."""
+        # The frame may have been torn down (e.g. logout) mid-send
+        if not self.progress_bar.winfo_exists():
+            return
+        self.progress_bar["value"] = done
+        self.progress_label.config(text=status)
+    
+    def _log_error(self, message):
+        """Append a failed send to the error log; must run on the Tk thread."""
+        if not self.error_log.winfo_exists():
+            return
+        self.error_log.configure(state="normal")
+        self.error_log.insert(tk.END, message + "\n")
+        self.error_log.see(tk.END)
+        self.error_log.configure(state="disabled")
+    
+    def _finish_send(self, sent, total, error=None):
+        """
+        Re-enable sending and summarize any failures; must run on the Tk thread.
+        
+        error is the exception that stopped the send early, if any.
+        """
+        if not self.send_button.winfo_exists():
+            return
+        self.send_button.config(state="normal")
+        if error is not None:
+            self.progress_label.config(text=f"Stopped after sending {sent}/{total} emails.")
+            messagebox.showerror(
+                "Sending stopped",
+                f"Sending stopped after {sent}/{total} emails because of an error:\n{error}"
+            )
+            return
+        failed = total - sent
+        if failed:
+            messagebox.showerror(
+                "Some emails failed",
+                f"Sent {sent}/{total} emails. {failed} failed; see the error log for details."
+            )
     
     def get_recipients(self):
-        """Get list of recipients from text field."""
-        raw = self.recipients_text.get("1.0", tk.END)
-        return [line.strip() for line in raw.splitlines() if line.strip()]
+        """
+        Get recipients from the text field, without duplicates.
+        
+        Returns:
+            Tuple of (recipients, invalid) where invalid lists the entries
+            that are not valid email addresses
+        """
+        return parse_recipients(self._iter_recipient_lines())
     
-    def on_body_text_modified(self, event=None):
-        """Called when body text is modified."""
-        if self.body_text.edit_modified():
-            # Reset the modified flag for next change detection
-            self.body_text.edit_modified(False)
+    def _iter_recipient_lines(self):
+        """
+        Yield the lines of the recipients field a block at a time, so a huge
+        paste is never copied out of the widget in one piece.
+        """
+        last_line = int(self.recipients_text.index("end-1c").split(".")[0])
+        for start in range(1, last_line + 1, RECIPIENT_READ_LINES):
+            block = self.recipients_text.get(f"{start}.0", f"{start + RECIPIENT_READ_LINES}.0")
+            yield from block.splitlines()
     
     def destroy(self):
         """Destroy the email frame."""
+        if self.pending_job:
+            self.root.after_cancel(self.pending_job)
+            self.pending_job = None
+        # A send in progress stops after its current batches; nothing new is accepted
+        self.send_cancel.set()
+        self.send_executor.shutdown(wait=False)
         if self.email_frame:
             self.email_frame.destroy()
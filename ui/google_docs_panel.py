@@ -1,23 +1,75 @@
 """Google Docs import panel component."""
 
+import threading
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk
 
-from docs_service import read_google_doc
 from utils import save_cache, load_cache
-from html_converter import html_to_markdown
+
+# Text of the formatting help dialog
+FORMATTING_HELP = """Markdown Formatting Guide
+
+• Bold Text
+  **your text** or __your text__
+  Example: **Hello World**
+
+• Italic Text
+  *your text*
+  Example: *Hello World*
+
+• Bold + Italic
+  ***your text***
+  Example: ***Hello World***
+
+• Underline
+  __your text__
+  Example: __Hello World__
+
+• Strikethrough
+  ~~your text~~
+  Example: ~~Hello World~~
+
+• Links
+  [link text](https://url.com)
+  Example: [Google](https://google.com)
+
+• Headings
+  # Heading 1
+  ## Heading 2
+  ### Heading 3
+
+• Bullet Lists
+  • Item 1
+  • Item 2
+  or
+  * Item 1
+  * Item 2
+
+• Paragraphs
+  Separate with blank lines
+  
+  New paragraph starts here
+
+• Personalization
+  {{name}}, {{first_name}} or {{email}}
+  Filled in from recipient lines like Jane Doe <jane@example.com>
+  Example: Hi {{first_name}},
+"""
 
 
 class GoogleDocsPanel:
     """Handles Google Docs document import functionality."""
     
+    # Formatting help dialog, built on first use and then hidden and shown
+    _help_dialog = None
+    
     def __init__(self, parent_frame, root, subject_entry, body_text, update_preview_callback):
         """
         Initialize the Google Docs panel.
         
         Args:
             parent_frame: Parent tkinter frame to add this panel to
-            root: Root window for update_idletasks
+            root: Root window, used to post load results back to the Tk thread
             subject_entry: Subject entry widget to populate
             body_text: Body text widget to populate
             update_preview_callback: Callback to update preview after loading
@@ -29,6 +81,7 @@ class GoogleDocsPanel:
         self.update_preview_callback = update_preview_callback
         
         self.doc_entry = None
+        self.import_btn = None
         self.docs_status_label = None
         self.loaded_body_html = None
         self.loaded_body_text = None
@@ -64,12 +117,12 @@ class GoogleDocsPanel:
         if cached_doc_url:
             self.doc_entry.insert(0, cached_doc_url)
         
-        import_btn = ttk.Button(
+        self.import_btn = ttk.Button(
             input_frame,
             text="📥 Import",
             command=self.load_from_google_docs
         )
-        import_btn.pack(side="right")
+        self.import_btn.pack(side="right")
         
         # Status label for Google Docs
         self.docs_status_label = ttk.Label(
@@ -81,131 +134,116 @@ class GoogleDocsPanel:
         self.docs_status_label.pack(anchor="w", pady=(5, 0))
     
     def load_from_google_docs(self):
-        """Load subject and body from a Google Doc."""
+        """Load subject and body from a Google Doc without blocking the UI."""
         doc_input = self.doc_entry.get().strip()
         
         if not doc_input:
             messagebox.showwarning("Missing Input", "Please enter a Google Docs URL or Document ID.")
             return
         
+        # Disable input during loading (but keep the text visible)
+        self.doc_entry.config(state="disabled")
+        self.import_btn.config(state="disabled")
+        self.docs_status_label.config(text="Loading document...", foreground="gray")
+        
+        threading.Thread(target=self._fetch_doc_worker, args=(doc_input,), daemon=True).start()
+    
+    def _fetch_doc_worker(self, doc_input):
+        """Fetch the document and convert it to Markdown on a worker thread."""
         try:
-            # Disable entry during loading (but keep the text visible)
-            self.doc_entry.config(state="disabled")
-            self.root.update_idletasks()
-            
-            # Fetch document content
+            from docs_service import read_google_doc
+            from html_converter import html_to_markdown
             result = read_google_doc(doc_input)
             
-            # Store the HTML version for reference
-            self.loaded_body_html = result.get('body_html', '')
-            
             # Convert HTML to Markdown for easy editing
-            body_markdown = html_to_markdown(self.loaded_body_html) if self.loaded_body_html else result['body']
-            self.loaded_body_text = body_markdown
-            
-            # Check for missing Subject or Body and show warnings
-            warnings = []
-            if not result['subject']:
-                warnings.append("Subject is empty")
-            if not body_markdown:
-                warnings.append("Body is empty")
-            
-            # Populate fields with Markdown (editable)
-            self.subject_entry.delete(0, tk.END)
-            self.subject_entry.insert(0, result['subject'])
-            
-            self.body_text.delete("1.0", tk.END)
-            self.body_text.insert("1.0", body_markdown)
-            
-            # Update preview
-            if self.update_preview_callback:
-                self.update_preview_callback()
-            
-            # Reset the modified flag after insertion
-            self.body_text.edit_modified(False)
-            
-            # Cache the successfully loaded doc URL
-            save_cache("last_doc_url", doc_input)
-            
-            # Show success or warning message
-            if warnings:
-                messagebox.showwarning(
-                    "Partial Load",
-                    f"Document loaded, but the following fields are missing:\n" + "\n".join([f"• {w}" for w in warnings]) +
-                    "\n\nPlease verify your document format."
-                )
-                self.docs_status_label.config(text="✓ Document loaded (with warnings)", foreground="orange")
-            else:
-                self.docs_status_label.config(text="✓ Document loaded successfully!", foreground="green")
-            
+            body_html = result.get('body_html', '')
+            result['body_markdown'] = html_to_markdown(body_html) if body_html else result['body']
         except Exception as e:
-            self.docs_status_label.config(text="", foreground="green")  # Clear status
-            error_msg = str(e)
-            # Provide friendly error message for 404
-            if "404" in error_msg and "not found" in error_msg.lower():
-                messagebox.showerror(
-                    "Document Not Found",
-                    "The document could not be found. Please check that:\n\n"
-                    "• The document ID or URL is correct\n"
-                    "• The document exists and hasn't been deleted\n"
-                    "• You have permission to access this document\n\n"
-                    "Tip: Make sure the document is shared with your Google account."
-                )
-            else:
-                messagebox.showerror("Load Error", f"Failed to load document:\n{error_msg}")
-        finally:
-            # Restore input field
-            self.doc_entry.config(state="normal")
+            self.root.after(0, self._show_doc_error, e)
+        else:
+            self.root.after(0, self._apply_doc_result, doc_input, result)
     
-    @staticmethod
-    def show_formatting_help(root):
+    def _apply_doc_result(self, doc_input, result):
+        """Fill in the loaded document; must run on the Tk thread."""
+        # The panel may have been torn down (e.g. logout) while loading
+        if not self.doc_entry.winfo_exists():
+            return
+        self._end_loading()
+        
+        # Store the HTML version for reference
+        self.loaded_body_html = result.get('body_html', '')
+        body_markdown = self.loaded_body_text = result['body_markdown']
+        
+        # Check for missing Subject or Body and show warnings
+        warnings = []
+        if not result['subject']:
+            warnings.append("Subject is empty")
+        if not body_markdown:
+            warnings.append("Body is empty")
+        
+        # Populate fields with Markdown (editable)
+        self.subject_entry.delete(0, tk.END)
+        self.subject_entry.insert(0, result['subject'])
+        
+        self.body_text.delete("1.0", tk.END)
+        self.body_text.insert("1.0", body_markdown)
+        
+        # Update preview
+        if self.update_preview_callback:
+            self.update_preview_callback()
+        
+        # Cache the successfully loaded doc URL
+        save_cache("last_doc_url", doc_input)
+        
+        # Show success or warning message
+        if warnings:
+            self.docs_status_label.config(text="✓ Document loaded (with warnings)", foreground="orange")
+            messagebox.showwarning(
+                "Partial Load",
+                f"Document loaded, but the following fields are missing:\n" + "\n".join([f"• {w}" for w in warnings]) +
+                "\n\nPlease verify your document format."
+            )
+        else:
+            self.docs_status_label.config(text="✓ Document loaded successfully!", foreground="green")
+    
+    def _show_doc_error(self, error):
+        """Report a failed load; must run on the Tk thread."""
+        if not self.doc_entry.winfo_exists():
+            return
+        self._end_loading()
+        self.docs_status_label.config(text="", foreground="green")  # Clear status
+        
+        error_msg = str(error)
+        # Provide friendly error message for 404
+        if "404" in error_msg and "not found" in error_msg.lower():
+            messagebox.showerror(
+                "Document Not Found",
+                "The document could not be found. Please check that:\n\n"
+                "• The document ID or URL is correct\n"
+                "• The document exists and hasn't been deleted\n"
+                "• You have permission to access this document\n\n"
+                "Tip: Make sure the document is shared with your Google account."
+            )
+        else:
+            messagebox.showerror("Load Error", f"Failed to load document:\n{error_msg}")
+    
+    def _end_loading(self):
+        """Restore the input fields disabled while loading."""
+        self.doc_entry.config(state="normal")
+        self.import_btn.config(state="normal")
+    
+    @classmethod
+    def show_formatting_help(cls, root):
         """Show a dialog with markdown formatting help."""
-        help_text = """Markdown Formatting Guide
-
-• Bold Text
-  **your text** or __your text__
-  Example: **Hello World**
-
-• Italic Text
-  *your text*
-  Example: *Hello World*
-
-• Bold + Italic
-  ***your text***
-  Example: ***Hello World***
-
-• Underline
-  __your text__
-  Example: __Hello World__
-
-• Strikethrough
-  ~~your text~~
-  Example: ~~Hello World~~
-
-• Links
-  [link text](https://url.com)
-  Example: [Google](https://google.com)
-
-• Headings
-  # Heading 1
-  ## Heading 2
-  ### Heading 3
-
-• Bullet Lists
-  • Item 1
-  • Item 2
-  or
-  * Item 1
-  * Item 2
-
-• Paragraphs
-  Separate with blank lines
-  
-  New paragraph starts here
-"""
+        dialog = cls._help_dialog
+        if dialog is not None and dialog.winfo_exists():
+            dialog.deiconify()
+            dialog.lift()
+            dialog.grab_set()
+            return
         
         # Create a custom dialog
-        dialog = tk.Toplevel(root)
+        dialog = cls._help_dialog = tk.Toplevel(root)
         dialog.title("Markdown Formatting Help")
         dialog.geometry("500x600")
         
@@ -234,12 +272,19 @@ class GoogleDocsPanel:
             wrap="word"
         )
         help_display.pack(fill="both", expand=True)
-        help_display.insert("1.0", help_text)
+        help_display.insert("1.0", FORMATTING_HELP)
         help_display.config(state="disabled")
         
+        # Closing only hides the dialog so the next click can reuse it
+        def hide():
+            dialog.grab_release()
+            dialog.withdraw()
+        
+        dialog.protocol("WM_DELETE_WINDOW", hide)
+        
         # Close button
         ttk.Button(
             main_frame,
             text="Got it!",
-            command=dialog.destroy
+            command=hide
         ).pack(pady=(0, 0))
@@ -1,11 +1,17 @@
 """Google Sheets import panel component."""
 
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, ttk
 
 from utils import save_cache, load_cache
 
 
+# Sheets requests run here, off the Tk thread. One worker keeps them in
+# order and keeps the shared Sheets service on a single thread at a time.
+_SHEETS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets")
+
+
 class GoogleSheetsPanel:
     """Handles Google Sheets recipients import functionality."""
     
@@ -15,7 +21,7 @@ class GoogleSheetsPanel:
         
         Args:
             parent_frame: Parent tkinter frame to add this panel to
-            root: Root window for update_idletasks and after_idle
+            root: Root window, used to post results back to the Tk thread
             recipients_text: Recipients text widget to populate
         """
         self.parent_frame = parent_frame
@@ -26,7 +32,10 @@ class GoogleSheetsPanel:
         self.column_var = None
         self.column_combo = None
         self.load_columns_btn = None
+        self.import_recipients_btn = None
         self.sheets_status_label = None
+        # Identifies the latest columns request; results of any other are stale
+        self.columns_request = None
         
         self.create_ui()
     
@@ -95,12 +104,12 @@ class GoogleSheetsPanel:
         self.load_columns_btn.pack(side="left", padx=(0, 10))
         
         # Import button
-        import_recipients_btn = ttk.Button(
+        self.import_recipients_btn = ttk.Button(
             column_select_frame,
             text="📥 Import Recipients",
             command=self.load_recipients_from_sheet
         )
-        import_recipients_btn.pack(side="left")
+        self.import_recipients_btn.pack(side="left")
         
         # Status labels for Sheets
         sheets_status_frame = ttk.Frame(sheets_frame)
@@ -114,16 +123,18 @@ class GoogleSheetsPanel:
         )
         self.sheets_status_label.pack(anchor="w")
         
-        # Auto-load columns if sheet URL is cached (run after UI is ready)
+        # Auto-load columns if sheet URL is cached, once the window has had
+        # a chance to paint
         if cached_sheet_url:
-            self.root.after_idle(lambda: self.load_sheet_columns(silent=True))
+            self.root.after(50, lambda: self.load_sheet_columns(silent=True))
     
     def load_sheet_columns(self, silent=False):
         """
-        Load column headers from the Google Sheet.
+        Load column headers from the Google Sheet without blocking the UI.
         
         Args:
             silent: If True, don't show success status message (for auto-load on startup)
+                and leave the inputs usable while loading
         """
         sheet_input = self.sheet_entry.get().strip()
         
@@ -132,46 +143,40 @@ class GoogleSheetsPanel:
                 messagebox.showwarning("Missing Input", "Please enter a Google Sheets URL or Spreadsheet ID.")
             return
         
+        request = self.columns_request = object()
+        
+        # Disable input during loading
+        if not silent:
+            self._set_loading(True)
+            self.sheets_status_label.config(text="Loading columns...", foreground="gray")
+        
+        def fetch():
+            from sheets_service import get_sheet_columns
+            return get_sheet_columns(sheet_input)
+        
+        _SHEETS_EXECUTOR.submit(fetch).add_done_callback(
+            lambda future: self.root.after(0, self._on_columns_loaded, future, request, sheet_input, silent)
+        )
+    
+    def _on_columns_loaded(self, future, request, sheet_input, silent):
+        """Show the fetched column headers; must run on the Tk thread."""
+        # The panel may have been torn down (e.g. logout) while loading
+        if not self.sheet_entry.winfo_exists():
+            return
+        if not silent:
+            self._set_loading(False)
+        
+        # Drop results of a request that was superseded, or whose sheet
+        # the user has since edited away from
+        if request is not self.columns_request:
+            return
+        if sheet_input != self.sheet_entry.get().strip():
+            self.columns_request = None
+            return
+        self.columns_request = None
+        
         try:
-            # Disable entry during loading
-            self.sheet_entry.config(state="disabled")
-            self.root.update_idletasks()
-            
-            # Fetch column headers
-            from sheets_service import get_sheet_columns, column_number_to_letter
-            headers = get_sheet_columns(sheet_input)
-            
-            if not headers:
-                messagebox.showwarning("No Headers", "No column headers found in the sheet.")
-                return
-            
-            # Create column options with letter and header name
-            column_options = []
-            for i, header in enumerate(headers):
-                col_letter = column_number_to_letter(i)
-                column_options.append(f"{col_letter}: {header}")
-            
-            # Update combobox
-            self.column_combo['values'] = column_options
-            
-            # Cache the successfully loaded sheet URL
-            save_cache("last_sheet_url", sheet_input)
-            
-            # Select first column by default if none cached
-            if column_options and not self.column_var.get():
-                self.column_combo.current(0)
-                self.column_var.set(column_options[0])
-            
-            # Update button text to Reload
-            self.load_columns_btn.config(text="🔄 Reload Columns")
-            
-            # Show success status (unless silent auto-load)
-            if not silent:
-                self.sheets_status_label.config(
-                    text=f"✓ Found {len(headers)} column{'s' if len(headers) != 1 else ''}!",
-                    foreground="green"
-                )
-            
+            headers = future.result()
         except Exception as e:
             self.sheets_status_label.config(text="", foreground="green")  # Clear status
             # Skip error dialogs during silent auto-load
@@ -195,12 +200,40 @@ class GoogleSheetsPanel:
                     )
                 else:
                     messagebox.showerror("Load Error", f"Failed to load columns:\n{error_msg}")
-        finally:
-            # Restore input field
-            self.sheet_entry.config(state="normal")
+            return
+        
+        if not headers:
+            self.sheets_status_label.config(text="", foreground="green")  # Clear status
+            messagebox.showwarning("No Headers", "No column headers found in the sheet.")
+            return
+        
+        # Create column options with letter and header name
+        from sheets_service import column_number_to_letter
+        column_options = [f"{column_number_to_letter(i)}: {header}" for i, header in enumerate(headers)]
+        
+        # Update combobox
+        self.column_combo['values'] = column_options
+        
+        # Cache the successfully loaded sheet URL
+        save_cache("last_sheet_url", sheet_input)
+        
+        # Select first column by default if none cached
+        if column_options and not self.column_var.get():
+            self.column_combo.current(0)
+            self.column_var.set(column_options[0])
+        
+        # Update button text to Reload
+        self.load_columns_btn.config(text="🔄 Reload Columns")
+        
+        # Show success status (unless silent auto-load)
+        if not silent:
+            self.sheets_status_label.config(
+                text=f"✓ Found {len(headers)} column{'s' if len(headers) != 1 else ''}!",
+                foreground="green"
+            )
     
     def load_recipients_from_sheet(self):
-        """Load recipients from the selected column in the Google Sheet."""
+        """Load recipients from the selected column in the Google Sheet without blocking the UI."""
         sheet_input = self.sheet_entry.get().strip()
         selected_column = self.column_var.get()
         
@@ -212,35 +245,29 @@ class GoogleSheetsPanel:
             messagebox.showwarning("Missing Selection", "Please select a column first. Click 'Load Columns' to see available columns.")
             return
         
-        try:
-            # Extract column letter from selection (format is "A: Header Name")
-            col_letter = selected_column.split(':')[0].strip()
-            
-            # Disable UI during loading
-            self.sheet_entry.config(state="disabled")
-            self.column_combo.config(state="disabled")
-            self.root.update_idletasks()
-            
-            # Fetch recipients from column
+        # Extract column letter from selection (format is "A: Header Name")
+        col_letter = selected_column.split(':')[0].strip()
+        
+        # Disable UI during loading
+        self._set_loading(True)
+        self.sheets_status_label.config(text="Importing recipients...", foreground="gray")
+        
+        def fetch():
             from sheets_service import read_column_from_sheet
-            recipients = read_column_from_sheet(sheet_input, col_letter)
-            
-            if not recipients:
-                messagebox.showwarning("No Data", "No email addresses found in the selected column.")
-                return
-            
-            # Clear existing recipients
-            self.recipients_text.delete("1.0", tk.END)
-            
-            # Insert recipients (one per line)
-            self.recipients_text.insert("1.0", "\n".join(recipients))
-            
-            # Show success status
-            self.sheets_status_label.config(
-                text=f"✓ Imported {len(recipients)} email address{'es' if len(recipients) != 1 else ''}!",
-                foreground="green"
-            )
-            
+            return read_column_from_sheet(sheet_input, col_letter)
+        
+        _SHEETS_EXECUTOR.submit(fetch).add_done_callback(
+            lambda future: self.root.after(0, self._on_recipients_loaded, future)
+        )
+    
+    def _on_recipients_loaded(self, future):
+        """Fill in the fetched recipients; must run on the Tk thread."""
+        if not self.sheet_entry.winfo_exists():
+            return
+        self._set_loading(False)
+        
+        try:
+            recipients = future.result()
         except Exception as e:
             self.sheets_status_label.config(text="", foreground="green")  # Clear status
             error_msg = str(e)
@@ -256,10 +283,32 @@ class GoogleSheetsPanel:
                 )
             else:
                 messagebox.showerror("Import Error", f"Failed to import recipients:\n{error_msg}")
-        finally:
-            # Restore UI
-            self.sheet_entry.config(state="normal")
-            self.column_combo.config(state="readonly")
+            return
+        
+        if not recipients:
+            self.sheets_status_label.config(text="", foreground="green")  # Clear status
+            messagebox.showwarning("No Data", "No email addresses found in the selected column.")
+            return
+        
+        # Clear existing recipients
+        self.recipients_text.delete("1.0", tk.END)
+        
+        # Insert recipients (one per line)
+        self.recipients_text.insert("1.0", "\n".join(recipients))
+        
+        # Show success status
+        self.sheets_status_label.config(
+            text=f"✓ Imported {len(recipients)} email address{'es' if len(recipients) != 1 else ''}!",
+            foreground="green"
+        )
+    
+    def _set_loading(self, loading):
+        """Disable the inputs while a Sheets request is in flight, or restore them."""
+        state = "disabled" if loading else "normal"
+        self.sheet_entry.config(state=state)
+        self.load_columns_btn.config(state=state)
+        self.import_recipients_btn.config(state=state)
+        self.column_combo.config(state="disabled" if loading else "readonly")
     
     def on_column_selected(self, event=None):
         """Cache the selected column when user makes a selection."""
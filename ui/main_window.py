@@ -10,6 +10,8 @@ from .email_frame import EmailFrame
 class BulkMailerUI:
     """Main application window coordinator."""
     
+    __slots__ = ("root", "service", "auth_frame_component", "email_frame_component")
+    
     def __init__(self, root):
         """
         Initialize the main application UI.
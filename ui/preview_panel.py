@@ -5,7 +5,78 @@ from tkinter import scrolledtext, ttk
 import re
 from html import unescape
 
-from html_converter import markdown_to_html
+# Tags with their attributes; a stray '<' in the text is not a tag
+_HTML_TAG_RE = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)([^<>]*)>')
+_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
+_NEWLINES_RE = re.compile(r'(\n+)')
+
+# HTML tags rendered as a style, mapped to the style they switch on
+_STYLE_TAGS = {
+    'strong': 'bold',
+    'b': 'bold',
+    'em': 'italic',
+    'i': 'italic',
+    'u': 'underline',
+    's': 'strike',
+}
+
+# Plain text inserted for block tags, as (opening, closing)
+_BLOCK_TAGS = {
+    'li': ('  • ', '\n'),
+    'p': ('', '\n\n'),
+}
+_BLOCK_TAGS.update({f'h{i}': ('\n', '\n') for i in range(1, 7)})
+
+# Text widget tags used by the preview and how each looks
+_PREVIEW_TAG_STYLES = {
+    'bold': {'font': ("Helvetica", 11, "bold")},
+    'italic': {'font': ("Helvetica", 11, "italic")},
+    'bold_italic': {'font': ("Helvetica", 11, "bold italic")},
+    'underline': {'underline': True},
+    'strike': {'overstrike': True},
+    'link': {'foreground': "#1a73e8", 'underline': True},
+    'url': {'foreground': "gray50"},
+}
+_PREVIEW_TAG_STYLES.update({
+    f'h{i}': {'font': ("Helvetica", size, "bold")}
+    for i, size in enumerate((20, 18, 16, 14, 12, 11), start=1)
+})
+
+# Characters outside the Basic Multilingual Plane, which Tk may count
+# differently from Python when converting offsets to text indices
+_ASTRAL_RE = re.compile('[^\u0000-\uffff]')
+
+# Milliseconds of typing quiet before the preview is re-rendered
+PREVIEW_DELAY_MS = 150
+
+
+def _shown_prefix_length(old, new):
+    """
+    Return how many characters at the start of the new preview segments
+    are already shown, with the same tags, by the old ones.
+    """
+    length = 0
+    for (old_text, old_tags), (new_text, new_tags) in zip(old, new):
+        if old_tags != new_tags:
+            break
+        if old_text != new_text:
+            length += _common_prefix_length(old_text, new_text)
+            break
+        length += len(new_text)
+    return length
+
+
+def _common_prefix_length(a, b):
+    """Return the length of the longest common prefix of a and b."""
+    # Binary search on slice comparisons, which run in C
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
 
 
 class PreviewPanel:
@@ -30,6 +101,11 @@ class PreviewPanel:
         self.preview_text = None
         self.preview_button = None
         self.preview_visible = False
+        self._preview_after_id = None
+        # Markdown the preview currently shows, to skip re-rendering it,
+        # and the text it rendered to, to only replace what changed
+        self._last_markdown = None
+        self._last_preview = []
         
         self.create_preview_widgets()
     
@@ -55,6 +131,9 @@ class PreviewPanel:
             background="#f0f0f0"
         )
         self.preview_text.pack(fill="both", expand=True)
+        
+        for tag, style in _PREVIEW_TAG_STYLES.items():
+            self.preview_text.tag_configure(tag, **style)
     
     def set_preview_button(self, button):
         """Set the reference to the preview toggle button."""
@@ -80,89 +159,178 @@ class PreviewPanel:
             if paned_width > 1:  # Only set if width is valid
                 self.body_paned.sashpos(0, paned_width // 2)
             # Update preview when showing
-            self.update_preview()
+            self._do_update_preview()
         
         # Remove focus from button to avoid white border
         self.root.focus_set()
     
     def update_preview(self, event=None):
-        """Update the HTML preview in real-time as user types."""
+        """
+        Schedule a preview update, restarting the delay on every call so a
+        burst of keystrokes is rendered once after typing pauses.
+        Nothing is done while the preview is hidden; showing it renders.
+        """
+        if not self.preview_visible:
+            return
+        if self._preview_after_id:
+            self.root.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.root.after(PREVIEW_DELAY_MS, self._do_update_preview)
+    
+    def _do_update_preview(self):
+        """Render the current body into the preview."""
+        self._preview_after_id = None
+        if not self.preview_visible:
+            return
         try:
+            from html_converter import markdown_to_html
+            
             # Get current Markdown text
-            markdown_text = self.body_text.get("1.0", tk.END).strip()
+            markdown_text = self.body_text.get("1.0", "end-1c").strip()
+            
+            # Cursor movement and modifier keys don't change the text
+            if markdown_text == self._last_markdown:
+                return
             
             # Convert to HTML
             html = markdown_to_html(markdown_text)
             
             # Render a simplified version in the preview
-            preview_text = self.render_html_for_preview(html)
+            segments = self.render_html_for_preview(html)
             
-            # Update preview widget
+            # Update preview widget, replacing only the text after the part
+            # that is unchanged; typing usually only changes the tail
+            start = _shown_prefix_length(self._last_preview, segments)
+            if _ASTRAL_RE.search("".join(text for text, _ in segments), 0, start):
+                start = 0
+            
+            # Insert the rest as (text, tags, text, tags, ...) in one call
+            insert_args = []
+            skip = start
+            for text, tags in segments:
+                if skip >= len(text):
+                    skip -= len(text)
+                    continue
+                insert_args += (text[skip:], tags)
+                skip = 0
+            
+            index = f"1.0+{start}c"
             self.preview_text.config(state="normal")
-            self.preview_text.delete("1.0", tk.END)
-            self.preview_text.insert("1.0", preview_text)
+            self.preview_text.delete(index, tk.END)
+            if insert_args:
+                self.preview_text.insert(index, *insert_args)
             self.preview_text.config(state="disabled")
+            self._last_markdown = markdown_text
+            self._last_preview = segments
         except Exception:
             # Silently handle preview errors
             pass
     
     @staticmethod
     def render_html_for_preview(html):
-        """Convert HTML to a readable preview format (simplified rendering)."""
-        if not html:
-            return ""
-        
-        # This is a simplified text-based preview
-        # Remove HTML tags but show structure
-        preview = html
-        
-        # Show headings with emphasis
-        for i in range(1, 7):
-            preview = re.sub(
-                f'<h{i}[^>]*>(.*?)</h{i}>',
-                lambda m: f"\n{'=' * (7-i)} {m.group(1).upper()} {'=' * (7-i)}\n",
-                preview,
-                flags=re.IGNORECASE | re.DOTALL
-            )
-        
-        # Show bold with indicators
-        preview = re.sub(r'<strong[^>]*>(.*?)</strong>', r'**\1**', preview, flags=re.IGNORECASE | re.DOTALL)
-        preview = re.sub(r'<b[^>]*>(.*?)</b>', r'**\1**', preview, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Show italic with indicators
-        preview = re.sub(r'<em[^>]*>(.*?)</em>', r'*\1*', preview, flags=re.IGNORECASE | re.DOTALL)
-        preview = re.sub(r'<i[^>]*>(.*?)</i>', r'*\1*', preview, flags=re.IGNORECASE | re.DOTALL)
-        
-        # Show underline
-        preview = re.sub(r'<u[^>]*>(.*?)</u>', r'_\1_', preview, flags=re.IGNORECASE | re.DOTALL)
+        """
+        Convert HTML to styled preview text (simplified rendering).
         
-        # Show strikethrough
-        preview = re.sub(r'<s[^>]*>(.*?)</s>', r'~~\1~~', preview, flags=re.IGNORECASE | re.DOTALL)
+        Returns:
+            List of (text, tags) segments, tags being a tuple of the Text
+            widget tags in _PREVIEW_TAG_STYLES to show the text with
+        """
+        if not html:
+            return []
         
-        # Show links
-        preview = re.sub(
-            r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>(.*?)</a>',
-            r'\2 (→ \1)',
-            preview,
-            flags=re.IGNORECASE | re.DOTALL
-        )
+        # Walk the tags once, tracking which styles are on; structure is
+        # shown with plain text and other tags are dropped
+        segments = []
+        styles = dict.fromkeys(_STYLE_TAGS.values(), 0)
+        links = []
+        headings = []
+        pos = 0
         
-        # Handle lists
-        preview = re.sub(r'<li[^>]*>(.*?)</li>', r'  • \1\n', preview, flags=re.IGNORECASE | re.DOTALL)
-        preview = re.sub(r'</?ul[^>]*>', '', preview, flags=re.IGNORECASE)
-        preview = re.sub(r'</?ol[^>]*>', '', preview, flags=re.IGNORECASE)
+        def current_tags():
+            if headings:
+                tags = [headings[-1]]
+            elif styles['bold'] and styles['italic']:
+                tags = ['bold_italic']
+            elif styles['bold']:
+                tags = ['bold']
+            elif styles['italic']:
+                tags = ['italic']
+            else:
+                tags = []
+            if styles['underline']:
+                tags.append('underline')
+            if styles['strike']:
+                tags.append('strike')
+            if any(links):
+                tags.append('link')
+            return tuple(tags)
         
-        # Handle paragraphs and breaks
-        preview = re.sub(r'<p[^>]*>(.*?)</p>', r'\1\n\n', preview, flags=re.IGNORECASE | re.DOTALL)
-        preview = re.sub(r'<br\s*/?>', '\n', preview, flags=re.IGNORECASE)
+        for match in _HTML_TAG_RE.finditer(html):
+            if match.start() > pos:
+                segments.append((unescape(html[pos:match.start()]), current_tags()))
+            pos = match.end()
+            closing, name, attrs = match.groups()
+            name = name.lower()
+            
+            if name in _STYLE_TAGS:
+                style = _STYLE_TAGS[name]
+                styles[style] = max(0, styles[style] + (-1 if closing else 1))
+            elif name == 'br':
+                segments.append(('\n', ()))
+            elif name == 'a':
+                # Links show their target after the text
+                if closing:
+                    href = links.pop() if links else None
+                    if href:
+                        segments.append((f' (→ {href})', ('url',)))
+                else:
+                    href_match = _HREF_RE.search(attrs)
+                    links.append(href_match.group(1) if href_match else None)
+            elif name in _BLOCK_TAGS:
+                if name[0] == 'h':
+                    if closing:
+                        if headings:
+                            headings.pop()
+                    else:
+                        headings.append(name)
+                segments.append((_BLOCK_TAGS[name][1 if closing else 0], ()))
         
-        # Remove any remaining HTML tags
-        preview = re.sub(r'<[^>]+>', '', preview)
+        if pos < len(html):
+            segments.append((unescape(html[pos:]), current_tags()))
         
-        # Decode HTML entities
-        preview = unescape(preview)
+        # Collapse runs of three or more newlines, drop leading and trailing
+        # whitespace, and merge neighbouring segments with the same tags
+        result = []
+        newlines = 0
+        for text, tags in segments:
+            for piece in _NEWLINES_RE.split(text):
+                if not piece:
+                    continue
+                if piece[0] == '\n':
+                    newlines += len(piece)
+                    continue
+                if not result:
+                    piece = piece.lstrip()
+                    if not piece:
+                        continue
+                elif newlines:
+                    _append_segment(result, '\n' * min(newlines, 2), ())
+                newlines = 0
+                _append_segment(result, piece, tags)
         
-        # Clean up excessive whitespace
-        preview = re.sub(r'\n{3,}', '\n\n', preview)
+        if result:
+            text, tags = result[-1]
+            text = text.rstrip()
+            if text:
+                result[-1] = (text, tags)
+            else:
+                result.pop()
         
-        return preview.strip()
+        return result
+
+
+def _append_segment(segments, text, tags):
+    """Append (text, tags) to segments, extending the last one if the tags match."""
+    if segments and segments[-1][1] == tags:
+        segments[-1] = (segments[-1][0] + text, tags)
+    else:
+        segments.append((text, tags))
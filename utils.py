@@ -1,12 +1,31 @@
+import os
 import sys
 import json
+import atexit
+import threading
+from datetime import date
+from functools import lru_cache
 from pathlib import Path
 
 
+# Seconds to wait after a save_cache call before writing app_cache.json,
+# so a burst of saves costs a single write
+CACHE_FLUSH_DELAY = 0.5
+
+# Contents of app_cache.json, read on first use and kept in memory.
+# Saves may come from worker threads, so access goes through the lock.
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+_FLUSH_TIMER = None
+
+
+@lru_cache(maxsize=None)
 def get_app_data_dir():
     """
     Get the application's data directory for storing user files.
     This is separate from the source code directory and always writable.
+    
+    The directory is resolved and created on the first call only.
     """
     if getattr(sys, 'frozen', False):
         # Running as PyInstaller bundle
@@ -37,7 +56,7 @@ def get_resource_path(relative_path):
     When running as a PyInstaller bundle, files are extracted to a temp folder.
     sys._MEIPASS contains the path to that temp folder.
     
-    For user-writable files (like token.pickle), we use the app's directory or
+    For user-writable files (like token.json), we use the app's directory or
     the user's home directory.
     """
     try:
@@ -60,39 +79,70 @@ def get_data_path(relative_path):
     return get_app_data_dir() / relative_path
 
 
+def _get_cache():
+    """Return the in-memory cache, reading app_cache.json the first time."""
+    global _CACHE
+    if _CACHE is None:
+        cache_file = get_data_path("app_cache.json")
+        _CACHE = {}
+        if cache_file.exists():
+            try:
+                _CACHE = json.loads(cache_file.read_bytes())
+            except (json.JSONDecodeError, IOError):
+                pass
+    return _CACHE
+
+
 def save_cache(key, value):
     """
-    Save a key-value pair to the app's cache file.
+    Save a key-value pair to the app's cache.
+    
+    The value is available to load_cache at once; the file is written
+    shortly afterwards, and at the latest when the app exits.
     
     Args:
         key: The cache key (string)
         value: The value to cache (must be JSON-serializable)
     """
-    cache_file = get_data_path("app_cache.json")
-    
-    # Load existing cache
-    cache = {}
-    if cache_file.exists():
+    global _FLUSH_TIMER
+    with _CACHE_LOCK:
+        cache = _get_cache()
+        if key in cache and cache[key] == value:
+            return  # Unchanged; nothing to write
+        cache[key] = value
+        if _FLUSH_TIMER is None:
+            _FLUSH_TIMER = threading.Timer(CACHE_FLUSH_DELAY, flush_cache)
+            _FLUSH_TIMER.daemon = True
+            _FLUSH_TIMER.start()
+
+
+def flush_cache():
+    """Write pending save_cache changes to the app's cache file."""
+    global _FLUSH_TIMER
+    with _CACHE_LOCK:
+        if _FLUSH_TIMER is None:
+            return  # Nothing changed since the last write
+        _FLUSH_TIMER.cancel()
+        _FLUSH_TIMER = None
+        
+        # Write a temporary file and swap it in, so a crash mid-write
+        # leaves the previous cache intact
+        cache_file = get_data_path("app_cache.json")
+        temp_file = cache_file.with_suffix(".json.tmp")
         try:
-            with open(cache_file, 'r') as f:
-                cache = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            cache = {}
-    
-    # Update cache
-    cache[key] = value
-    
-    # Save cache
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache, f, indent=2)
-    except IOError as e:
-        print(f"Failed to save cache: {e}")
+            # Compact output; the file is only read back by load_cache
+            temp_file.write_text(json.dumps(_CACHE, separators=(',', ':')))
+            os.replace(temp_file, cache_file)
+        except IOError as e:
+            print(f"Failed to save cache: {e}")
+
+
+atexit.register(flush_cache)
 
 
 def load_cache(key, default=None):
     """
-    Load a value from the app's cache file.
+    Load a value from the app's cache.
     
     Args:
         key: The cache key (string)
@@ -101,14 +151,80 @@ def load_cache(key, default=None):
     Returns:
         The cached value or default if not found
     """
-    cache_file = get_data_path("app_cache.json")
+    with _CACHE_LOCK:
+        return _get_cache().get(key, default)
+
+
+def save_pending_send(pending):
+    """
+    Save a send that is scheduled to continue later, so it survives
+    restarts and crashes.
+    
+    Args:
+        pending: JSON-serializable dict describing the send, or None to
+            clear it
+    """
+    pending_file = get_data_path("pending_recipients.json")
     
-    if not cache_file.exists():
-        return default
+    if pending is None:
+        pending_file.unlink(missing_ok=True)
+        return
     
     try:
-        with open(cache_file, 'r') as f:
-            cache = json.load(f)
-            return cache.get(key, default)
+        with open(pending_file, 'w') as f:
+            json.dump(pending, f)
+    except IOError as e:
+        print(f"Failed to save pending recipients: {e}")
+
+
+def load_pending_send():
+    """
+    Load the send scheduled with save_pending_send.
+    
+    Returns:
+        The saved dict, or None if nothing is pending
+    """
+    pending_file = get_data_path("pending_recipients.json")
+    
+    if not pending_file.exists():
+        return None
+    
+    try:
+        with open(pending_file, 'r') as f:
+            return json.load(f)
     except (json.JSONDecodeError, IOError):
-        return default
+        return None
+
+
+def load_sent_today(account):
+    """
+    Return how many emails account has sent today, as counted by
+    record_sent_today.
+    
+    Args:
+        account: The account's email address
+    """
+    saved = load_cache("sent_today")
+    if isinstance(saved, dict) and saved.get("date") == date.today().isoformat():
+        return saved.get("counts", {}).get(account, 0)
+    return 0
+
+
+def record_sent_today(account, count):
+    """
+    Add count to account's sent-today counter. Counts are kept per
+    address, so they survive signing in again with a new token.
+    
+    Args:
+        account: The account's email address
+        count: Number of emails just sent
+    """
+    if not count:
+        return
+    saved = load_cache("sent_today")
+    today = date.today().isoformat()
+    counts = {}
+    if isinstance(saved, dict) and saved.get("date") == today:
+        counts = dict(saved.get("counts", {}))
+    counts[account] = counts.get(account, 0) + count
+    save_cache("sent_today", {"date": today, "counts": counts})